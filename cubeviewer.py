@@ -0,0 +1,126 @@
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPushButton,
+    QSlider,
+    QSpinBox,
+    QLabel,
+    QFileDialog,
+)
+from tools import Frame, TimeCube
+import pyqtgraph as pg
+import numpy as np
+
+
+class CubeViewer(QWidget):
+    def __init__(self, decoder, convert_adc, samples=None, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("Time-resolved image")
+        self.decoder = decoder
+        self.convert_adc = convert_adc
+        self.samples = samples
+        self.cube = None
+        self.indices = None
+
+        self.timeBins = QSpinBox()
+        self.timeBins.setRange(1, 4096)
+        self.timeBins.setValue(64)
+        self.fps = QSpinBox()
+        self.fps.setRange(1, 200)
+        self.fps.setValue(30)
+        self.loadRun = QPushButton("Load run")
+        self.play = QPushButton("Play")
+        self.play.setCheckable(True)
+        self.slider = QSlider(Qt.Horizontal)
+        self.binLabel = QLabel("")
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Time bins"))
+        controls.addWidget(self.timeBins)
+        controls.addWidget(QLabel("FPS"))
+        controls.addWidget(self.fps)
+        controls.addWidget(self.loadRun)
+        controls.addWidget(self.play)
+
+        self.imageWidget = pg.GraphicsLayoutWidget()
+        self.view = self.imageWidget.addViewBox()
+        self.view.setMouseEnabled(x=False, y=False)
+        self.img_item = pg.ImageItem()
+        self.view.addItem(self.img_item)
+
+        cmap = pg.colormap.get("viridis")
+        self.img_item.setLookupTable(cmap.getLookupTable(0.0, 1.0, 256))
+        self.color_bar = pg.ColorBarItem(
+            values=(0, 1), colorMap=cmap, interactive=False
+        )
+        self.imageWidget.addItem(self.color_bar)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(self.imageWidget)
+        bottom = QHBoxLayout()
+        bottom.addWidget(self.slider)
+        bottom.addWidget(self.binLabel)
+        layout.addLayout(bottom)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.next_bin)
+        self.timeBins.valueChanged.connect(self.build_cube)
+        self.fps.valueChanged.connect(self.update_rate)
+        self.loadRun.clicked.connect(self.load_run)
+        self.play.toggled.connect(self.toggle_play)
+        self.slider.valueChanged.connect(self.show_bin)
+
+        self.build_cube()
+
+    def load_run(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Select Files", "", "Text Files (*.txt);;All Files (*)"
+        )
+        if not file_paths:
+            return
+        try:
+            frames = [Frame.from_file(file_path) for file_path in file_paths]
+            self.samples = np.stack([frame.samples for frame in frames])
+        except ValueError:
+            self.binLabel.setText("Invalid run files")
+            return
+        self.build_cube()
+
+    def build_cube(self):
+        if self.samples is None:
+            return
+        self.cube = TimeCube(
+            self.convert_adc(self.samples), self.decoder, self.timeBins.value()
+        )
+        levels = self.cube.levels()
+        self.indices = self.cube.lut_indices(levels)
+        self.color_bar.setLevels(levels)
+        self.slider.setRange(0, self.cube.time_bins - 1)
+        self.show_bin(self.slider.value())
+        self.view.setRange(self.img_item.boundingRect(), padding=0)
+
+    def show_bin(self, index):
+        if self.indices is None:
+            return
+        index = min(index, len(self.indices) - 1)
+        self.img_item.setImage(self.indices[index], autoLevels=False, levels=(0, 255))
+        start, stop = self.cube.edges[index], self.cube.edges[index + 1]
+        self.binLabel.setText(f"{index + 1}/{len(self.indices)} [{start}, {stop})")
+
+    def next_bin(self):
+        self.slider.setValue((self.slider.value() + 1) % (self.slider.maximum() + 1))
+
+    def update_rate(self):
+        self.timer.setInterval(int(1000 / self.fps.value()))
+
+    def toggle_play(self, checked):
+        if checked:
+            self.update_rate()
+            self.timer.start()
+            self.play.setText("Pause")
+        else:
+            self.timer.stop()
+            self.play.setText("Play")
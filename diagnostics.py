@@ -0,0 +1,18 @@
+from tools import Diagnostics
+import argparse
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Control diagnostics of a running DDC264EVM_UI session"
+    )
+    parser.add_argument(
+        "command",
+        choices=Diagnostics.commands,
+        help="on: start profiling, off: stop and write the report, "
+        "report: write a report and keep profiling",
+    )
+    args = parser.parse_args()
+
+    Diagnostics.request(args.command)
+    print(f"Diagnostics {args.command} requested")
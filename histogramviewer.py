@@ -0,0 +1,66 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QSpinBox,
+    QComboBox,
+    QCheckBox,
+    QLabel,
+)
+import pyqtgraph as pg
+import numpy as np
+
+
+class HistogramViewer(QWidget):
+    def __init__(self, histogram, convert_adc, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("Amplitude histogram")
+        self.histogram = histogram
+        self.convert_adc = convert_adc
+
+        self.channel = QSpinBox()
+        self.channel.setRange(0, histogram.channels)
+        self.channel.setSpecialValueText("All")
+        self.side = QComboBox()
+        self.side.addItems(histogram.sides)
+        self.logScale = QCheckBox("Log")
+        self.entriesLabel = QLabel("")
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Channel"))
+        controls.addWidget(self.channel)
+        controls.addWidget(self.side)
+        controls.addWidget(self.logScale)
+        controls.addWidget(self.entriesLabel)
+
+        self.graphWidget = pg.PlotWidget()
+        self.graphWidget.setLabel("left", "Counts")
+        self.graphWidget.setLabel("bottom", "Charge", units="C")
+        self.curve = self.graphWidget.plot(
+            stepMode="center", fillLevel=0, brush=(0, 0, 255, 80)
+        )
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(self.graphWidget)
+
+        self.channel.valueChanged.connect(self.refresh)
+        self.side.currentIndexChanged.connect(self.refresh)
+        self.logScale.toggled.connect(self.refresh)
+        self.refresh()
+
+    def refresh(self):
+        side = self.side.currentIndex()
+        channel = self.channel.value()
+        if channel == 0:
+            counts = self.histogram.counts[side].sum(axis=0)
+        else:
+            counts = self.histogram.counts[side, channel - 1]
+        self.entriesLabel.setText(
+            f"{int(counts.sum())} entries, {self.histogram.frames} frames"
+        )
+        self.graphWidget.setLogMode(y=self.logScale.isChecked())
+        if self.logScale.isChecked():
+            counts = np.maximum(counts, 1)
+        self.curve.setData(self.convert_adc(self.histogram.edges), counts)
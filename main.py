@@ -1,8 +1,19 @@
 from PyQt5.QtWidgets import QApplication
 from mainwindow import Ui
+import argparse
 import sys
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="DDC264EVM user interface")
+    parser.add_argument(
+        "--diagnostics",
+        action="store_true",
+        help="start with profiling and memory tracing enabled",
+    )
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
     ui = Ui()
+    if args.diagnostics:
+        ui.diagnosticsMode.setChecked(True)
     app.exec_()
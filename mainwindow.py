@@ -1,10 +1,47 @@
 from PyQt5 import uic
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, QThread
-from PyQt5.QtWidgets import QMainWindow, QFileDialog, QVBoxLayout
-from tools import FPGAControl
+from PyQt5.QtCore import Qt, QStringListModel, QTimer
+from PyQt5 import sip
+from PyQt5.QtWidgets import (
+    QMainWindow,
+    QFileDialog,
+    QVBoxLayout,
+    QComboBox,
+    QCompleter,
+)
+from tools import (
+    FPGAControl,
+    DecoderMap,
+    Frame,
+    SignalExtractor,
+    ParameterScan,
+    DeviceThread,
+    BadPixelMap,
+    FramePublisher,
+    Pipeline,
+    Extract,
+    Calibrate,
+    Decode,
+    Scale,
+    Normalize,
+    Threshold,
+    Mask,
+    AmplitudeHistogram,
+    RunBrowser,
+    AcquisitionSchedule,
+    RegionOfInterest,
+    Diagnostics,
+)
+from cubeviewer import CubeViewer
+from histogramviewer import HistogramViewer
 import pyqtgraph as pg
 import numpy as np
+import time
 import os
+import re
+import gc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
 
 
 class ReaderWorker(QObject):
@@ -12,33 +49,40 @@ class ReaderWorker(QObject):
     progress = pyqtSignal(int)
     status = pyqtSignal(str)
 
-    def __init__(self, fpga, folder_path, file_name, numFiles):
+    def __init__(self, device, folder_path, file_name, numFiles, timeout=None):
         super().__init__()
-        self.fpga = fpga
+        self.device = device
         self.folder_path = folder_path
         self.file_name = file_name
         self.numFiles = numFiles
+        self.timeout = timeout
         self.readFilePath = None
 
-    @pyqtSlot()
-    def run(self):
+    @staticmethod
+    def last_index(folder_path, file_name):
         existing_indices = []
-        if os.path.isdir(self.folder_path):
-            for fname in os.listdir(self.folder_path):
-                if fname.startswith(f"{self.file_name}_") and fname.endswith(".txt"):
+        if os.path.isdir(folder_path):
+            for fname in os.listdir(folder_path):
+                if fname.startswith(f"{file_name}_") and fname.endswith(".txt"):
                     try:
-                        idx = int(fname[len(f"{self.file_name}_") : -4])
+                        idx = int(fname[len(f"{file_name}_") : -4])
                         existing_indices.append(idx)
                     except ValueError:
                         continue
-        start_index = max(existing_indices) if existing_indices else 0
+        return max(existing_indices) if existing_indices else 0
+
+    @pyqtSlot()
+    def run(self):
+        start_index = self.last_index(self.folder_path, self.file_name)
 
         try:
             for i in range(self.numFiles):
                 file_index = start_index + i + 1
-                result = self.fpga.get_data(
-                    f"{self.folder_path}\\{self.file_name}", file_index - 1
-                )
+                result = self.device.call(
+                    "get_data",
+                    f"{self.folder_path}\\{self.file_name}",
+                    file_index - 1,
+                ).result(self.timeout)
                 self.status.emit(f"File {file_index} saved successfully")
                 self.progress.emit(i + 1)
             self.status.emit("Data read successfully")
@@ -49,15 +93,137 @@ class ReaderWorker(QObject):
         self.readFilePath = f"{self.file_name}_{start_index + self.numFiles}.txt"
 
 
+class ScheduleWorker(QObject):
+    finished = pyqtSignal()
+    progress = pyqtSignal(int)
+    status = pyqtSignal(str)
+
+    def __init__(self, device, schedule, folder_path, file_name, timeout=None):
+        super().__init__()
+        self.device = device
+        self.schedule = schedule
+        self.folder_path = folder_path
+        self.file_name = file_name
+        self.timeout = timeout
+        self.readFilePath = None
+
+    @pyqtSlot()
+    def run(self):
+        start_index = ReaderWorker.last_index(self.folder_path, self.file_name)
+        captured = []
+
+        def capture(frame_idx):
+            self.device.call(
+                "get_data",
+                os.path.join(self.folder_path, self.file_name),
+                start_index + frame_idx,
+            ).result(self.timeout)
+            captured.append(start_index + frame_idx + 1)
+
+        try:
+            self.schedule.run(
+                capture,
+                os.path.join(self.folder_path, f"{self.file_name}_schedule.csv"),
+                self.progress.emit,
+                self.status.emit,
+            )
+            self.status.emit(f"Schedule finished: {self.schedule.summary()}")
+        except Exception as e:
+            self.status.emit(f"Error during scheduled capture: {str(e)}")
+        finally:
+            if captured:
+                self.readFilePath = f"{self.file_name}_{captured[-1]}.txt"
+            self.finished.emit()
+
+
+class ScanWorker(QObject):
+    finished = pyqtSignal()
+    progress = pyqtSignal(int)
+    status = pyqtSignal(str)
+
+    def __init__(self, device, scan, timeout=None):
+        super().__init__()
+        self.device = device
+        self.scan = scan
+        self.timeout = timeout
+
+    @pyqtSlot()
+    def run(self):
+        timeout = None
+        if self.timeout is not None:
+            timeout = self.timeout * (self.scan.total_frames + len(self.scan.points))
+        try:
+            index_path = self.device.submit(
+                self.scan.run, self.progress.emit, self.status.emit
+            ).result(timeout)
+            state = "stopped" if self.scan.stopped else "finished"
+            self.status.emit(f"Scan {state}, index saved to {index_path}")
+        except Exception as e:
+            self.status.emit(f"Error during scan: {str(e)}")
+        finally:
+            self.finished.emit()
+
+
+class HistogramWorker(QObject):
+    finished = pyqtSignal()
+    progress = pyqtSignal(int)
+    status = pyqtSignal(str)
+    updated = pyqtSignal()
+    update_interval = 0.5
+
+    def __init__(self, device, histogram, numFrames, file_path, timeout=None):
+        super().__init__()
+        self.device = device
+        self.histogram = histogram
+        self.numFrames = numFrames
+        self.file_path = file_path
+        self.timeout = timeout
+
+    @pyqtSlot()
+    def run(self):
+        last_update = time.monotonic()
+        try:
+            for i in range(self.numFrames):
+                frame = self.device.call("capture_frame").result(self.timeout)
+                self.histogram.fill(frame.samples)
+                self.progress.emit(i + 1)
+                if time.monotonic() - last_update > self.update_interval:
+                    self.updated.emit()
+                    last_update = time.monotonic()
+            self.status.emit(f"Histogram saved to {self.file_path}")
+        except Exception as e:
+            self.status.emit(f"Error during histogram run: {str(e)}")
+        finally:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            self.histogram.save(self.file_path)
+            self.updated.emit()
+            self.finished.emit()
+
+
 class Ui(QMainWindow):
     conv_config = {"Free run": 0, "Low": 2, "High": 3}
     ddc_clk_config = {"Running": 1, "Low": 0}
     dclk_config = {"Running": 1, "Low": 0}
     hardware_trigger = {"Disabled": 0, "Enabled": 1}
+    command_timeout = 10.0
+    histogram_bins = 1024
+    default_image_shape = (16, 16)
+    shared_frames_name = "ddc264evm_frames"
+    run_cache_size = 32
+    run_prefetch = 4
+    diagnostics_poll_ms = 1000
+    device_done = pyqtSignal(object, object)
+    pipeline_done = pyqtSignal(object, object)
 
     def __init__(self):
         super().__init__()
 
+        self.fpga = None
+        self.device = DeviceThread()
+        self.device.start()
+        self.device_done.connect(lambda callback, future: callback(future))
+        self.pipeline_done.connect(lambda callback, future: callback(future))
+
         uic.loadUi("mainwindow.ui", self)
 
         self.setWindowTitle("DDC264EVM_UI")
@@ -115,6 +281,8 @@ class Ui(QMainWindow):
 
         self.edgeLeft.setText("156")
         self.edgeRight.setText("356")
+        self.extractionMethod.addItems(SignalExtractor.methods)
+        self.stepEdges.setPlaceholderText("Multi-step edges, e.g. 156, 256, 356")
 
         self.progressBar.setMinimum(0)
         self.progressBar.setValue(0)
@@ -122,6 +290,15 @@ class Ui(QMainWindow):
         self.progressBar.hide()
 
         self.nFiles.setText("1")
+        self.scheduleInterval.setText("2.0")
+        self.scheduleBurst.setText("1")
+        self.schedule = None
+        self.scan = None
+        self.publisher = None
+        self.roiSpec.setPlaceholderText("rows=0-7; cols=0-7; samples=100-511; sides=A")
+        self.scanGrid.setPlaceholderText(
+            "CONV_LOW_INT=50000,100000; ADC_RANGE=150.0,50.0"
+        )
 
         self.pixelX.setText("0.36")
         self.pixelY.setText("0.36")
@@ -143,15 +320,24 @@ class Ui(QMainWindow):
 
         self.traceNumber.addItem("--")
         self.traceNumber.addItem("Mean value")
-        for letter in ["A", "B"]:
-            for i in range(256):
-                self.traceNumber.addItem(f"{i+1}{letter}")
+        self.traceNumber.setEditable(True)
+        self.traceNumber.setInsertPolicy(QComboBox.NoInsert)
+        self.trace_channels = QStringListModel()
+        trace_completer = QCompleter(self.trace_channels, self)
+        trace_completer.setCaseSensitivity(Qt.CaseInsensitive)
+        trace_completer.setFilterMode(Qt.MatchStartsWith)
+        self.traceNumber.setCompleter(trace_completer)
+        self.traceNumber.lineEdit().setPlaceholderText("channel, e.g. 17A")
         self.graphWidget = pg.PlotWidget()
         layout = QVBoxLayout(self.tracePlot)
         layout.addWidget(self.graphWidget)
         self.graphWidget.setLabel("left", "Charge", units="C")
         self.graphWidget.setLabel("bottom", "Time")
         self.graphWidget.setMouseEnabled(x=False, y=False)
+        self.edge_lines = [
+            pg.InfiniteLine(angle=90, movable=True, pen=pg.mkPen("g", width=1))
+            for _ in range(2)
+        ]
 
         self.imageWidget = pg.GraphicsLayoutWidget()
         image_layout = QVBoxLayout(self.imagePlot)
@@ -164,12 +350,25 @@ class Ui(QMainWindow):
         self.image_file = ""
         self.open_beam_file = ""
         self.decoderMatrixLabel.setText("decoder_matrix.txt")
-        self.decoder_matrix = np.zeros((16, 16), dtype=int)
-        self.load_decoder_matrix(self.decoderMatrixLabel.text())
+        self.trace_frame = None
+        self.run_browser = RunBrowser(self.run_cache_size, self.run_prefetch)
+        self.runSlider.setRange(0, 0)
+        self.decoder = None
+        self.decoder_path = ""
+        self.bad_pixels = None
+        self.extractors = {}
+        self.frames = {}
+        self.pipeline_key = None
+        self.pipelines = None
+        self.pipeline_executor = ThreadPoolExecutor(max_workers=1)
+        self.extraction_requests = {}
+        self.display_key = None
+        self.displays = None
+        self.cube_viewer = None
 
         self.image_view = self.imageWidget.addViewBox()
         self.image_view.setAspectLocked(False)
-        self.img_item = pg.ImageItem(np.zeros((16, 16)))
+        self.img_item = pg.ImageItem(np.zeros(self.image_shape()))
         self.image_view.addItem(self.img_item)
         self.image_view.setRange(self.img_item.boundingRect(), padding=0)
         self.image_view.setMouseEnabled(x=False, y=False)
@@ -186,7 +385,7 @@ class Ui(QMainWindow):
 
         self.mix_view = self.mixWidget.addViewBox()
         self.mix_view.setAspectLocked(False)
-        self.mix_img_item = pg.ImageItem(np.zeros((16, 16)))
+        self.mix_img_item = pg.ImageItem(np.zeros(self.image_shape()))
         self.mix_view.addItem(self.mix_img_item)
         self.mix_view.setRange(self.mix_img_item.boundingRect(), padding=0)
         self.mix_view.setMouseEnabled(x=False, y=False)
@@ -196,24 +395,44 @@ class Ui(QMainWindow):
         )
         self.mix_color_bar.setImageItem(self.mix_img_item)
         self.mixWidget.addItem(self.mix_color_bar)
+        self.load_decoder_matrix(self.decoderMatrixLabel.text())
 
-        self.file_data = {}
-        self.image_data = np.zeros((16, 16))
-        self.dark_current_data = np.zeros((16, 16))
-        self.open_beam_data = np.zeros((16, 16))
+        self.image_data = np.zeros(self.image_shape())
+        self.dark_current_data = np.zeros(self.image_shape())
+        self.open_beam_data = np.zeros(self.image_shape())
         self.readFilePath.setText("")
 
         self.openBeam.setChecked(False)
         self.darkCurrent.setChecked(True)
 
+        self.diagnostics = Diagnostics(self.save_path)
+        self.diagnostics_restart = False
+        self.diagnostics.add_provider("Qt objects", self.qt_objects)
+        self.diagnostics_timer = QTimer(self)
+        self.diagnostics_timer.timeout.connect(self.poll_diagnostics)
+        self.diagnostics_timer.start(self.diagnostics_poll_ms)
+
         self.update_registers(is_startup=True)
         self.refresh_registers(is_startup=True)
 
         self.getData.clicked.connect(self.record_data)
+        self.recordHistogram.clicked.connect(self.record_histogram)
+        self.runScan.clicked.connect(self.run_scan)
+        self.runSchedule.clicked.connect(self.run_schedule)
+        self.applyRoi.clicked.connect(self.apply_roi)
+        self.diagnosticsMode.toggled.connect(self.toggle_diagnostics)
+        self.publishFrames.toggled.connect(self.toggle_publishing)
         self.ConvLowInt.textChanged.connect(self.update_time)
         self.ConvHighInt.textChanged.connect(self.update_time)
         self.readFileButton.clicked.connect(self.load_trace_file)
         self.traceNumber.currentTextChanged.connect(self.plot_trace)
+        self.runSlider.valueChanged.connect(self.browse_run)
+        self.previousRun.clicked.connect(
+            lambda: self.runSlider.setValue(self.runSlider.value() - 1)
+        )
+        self.nextRun.clicked.connect(
+            lambda: self.runSlider.setValue(self.runSlider.value() + 1)
+        )
         self.writeRegisters.clicked.connect(self.update_registers)
         self.hardReset.clicked.connect(self.hard_reset)
         self.refresh.clicked.connect(self.refresh_registers)
@@ -229,7 +448,9 @@ class Ui(QMainWindow):
             )
         )
         self.decoderMatrix.clicked.connect(self.load_decoder_matrix)
+        self.detectBadPixels.clicked.connect(self.detect_bad_pixels)
         self.buildImage.clicked.connect(self.build_image)
+        self.timeCube.clicked.connect(self.show_cube)
         self.imageUpperScale.textChanged.connect(self.change_scales)
         self.imageLowScale.textChanged.connect(self.change_scales)
         self.mixUpperScale.textChanged.connect(self.change_scales)
@@ -238,6 +459,12 @@ class Ui(QMainWindow):
         self.openBeam.toggled.connect(self.build_image)
         self.openBeam.clicked.connect(self.build_image)
         self.darkCurrent.clicked.connect(self.build_image)
+        self.edgeLeft.textChanged.connect(self.update_extraction)
+        self.edgeRight.textChanged.connect(self.update_extraction)
+        self.extractionMethod.currentTextChanged.connect(self.update_extraction)
+        self.stepEdges.textChanged.connect(self.update_extraction)
+        for line in self.edge_lines:
+            line.sigPositionChanged.connect(self.drag_edges)
 
         self.show()
 
@@ -262,7 +489,7 @@ class Ui(QMainWindow):
             ):
                 raise ValueError
 
-            self.fpga = FPGAControl(
+            params = (
                 5 * int(self.ConvLowInt.text()),
                 5 * int(self.ConvHighInt.text()),
                 self.conv_config[self.ConvConfig.currentText()],
@@ -282,33 +509,264 @@ class Ui(QMainWindow):
                 self.ADCrange.currentText(),
                 int(self.Format.currentText()[:-4]),
             )
-            if not is_startup:
-                self.statusBar().showMessage("Registers updated successfully")
         except ValueError:
             self.statusBar().showMessage("Invalid input")
+            return
+
+        def configured(future):
+            try:
+                self.fpga = future.result()
+            except Exception as e:
+                self.statusBar().showMessage(f"Error updating registers: {str(e)}")
+                return
+            if not is_startup:
+                self.statusBar().showMessage("Registers updated successfully")
+            frame_size = self.fpga.CHANNEL_COUNT * self.fpga.NDVALID_READ
+            if self.publisher is not None and (
+                self.publisher.capacity < frame_size
+                or self.publisher.channels < self.fpga.CHANNEL_COUNT
+            ):
+                self.restart_publishing()
+
+        self.run_device(
+            self.device.configure(
+                lambda: FPGAControl(*params), timeout=self.command_timeout
+            ),
+            configured,
+        )
 
     def refresh_registers(self, is_startup=False):
-        try:
-            self.fpga.refresh()
-            self.update_registers()
+        def refreshed(future):
+            try:
+                future.result()
+            except Exception as e:
+                self.statusBar().showMessage(f"Error refreshing registers: {str(e)}")
+                return
+            self.update_registers(is_startup=True)
             if not is_startup:
                 self.statusBar().showMessage(
                     "Registers refreshed and updated successfully"
                 )
-        except Exception as e:
-            self.statusBar().showMessage(f"Error refreshing registers: {str(e)}")
+
+        self.run_device(
+            self.device.call("refresh", timeout=self.command_timeout), refreshed
+        )
 
     def hard_reset(self):
-        try:
-            reset_result = self.fpga.reset_ddc()
-            clear_result = self.fpga.clear_triggers()
+        def reset(future):
+            try:
+                if future.result():
+                    self.statusBar().showMessage("Hard reset completed successfully")
+                else:
+                    self.statusBar().showMessage("Hard reset failed")
+            except Exception as e:
+                self.statusBar().showMessage(f"Error during hard reset: {str(e)}")
+
+        self.run_device(
+            self.device.call("hard_reset", timeout=self.command_timeout), reset
+        )
+
+    def toggle_publishing(self, checked):
+        previous = self.publisher
+        publisher = None
+        if checked:
+            try:
+                channels = int(self.ChannelCount.currentText())
+                publisher = FramePublisher(
+                    self.shared_frames_name,
+                    channels * int(self.nDVALIDRead.text()),
+                    channels,
+                )
+            except (ValueError, OSError) as e:
+                self.statusBar().showMessage(f"Cannot publish frames: {str(e)}")
+                self.publishFrames.setChecked(False)
+                return
+
+        def published(future):
+            try:
+                future.result()
+            except Exception as e:
+                if publisher is not None:
+                    publisher.close()
+                self.statusBar().showMessage(f"Error switching publishing: {str(e)}")
+                return
+            self.publisher = publisher
+            if checked:
+                self.statusBar().showMessage(
+                    f"Publishing frames to {self.shared_frames_name}"
+                )
+            elif previous is not None:
+                self.statusBar().showMessage(
+                    f"Frame publishing stopped: {previous.seq} published, "
+                    f"{previous.dropped} dropped as oversized, "
+                    f"{previous.lagging} notifications skipped for slow clients"
+                )
+
+        self.run_device(
+            self.device.set_publisher(publisher, timeout=self.command_timeout),
+            published,
+        )
+
+    def restart_publishing(self):
+        previous = self.publisher
+        self.publisher = None
+
+        def stopped(future):
+            try:
+                future.result()
+            except Exception as e:
+                self.statusBar().showMessage(f"Error switching publishing: {str(e)}")
+                return
+            self.toggle_publishing(True)
+            self.statusBar().showMessage(
+                f"Frame ring resized after {previous.dropped} oversized frames, "
+                "subscribers must reconnect"
+            )
+
+        self.run_device(
+            self.device.set_publisher(None, timeout=self.command_timeout), stopped
+        )
 
-            if reset_result and clear_result:
-                self.statusBar().showMessage("Hard reset completed successfully")
+    def apply_roi(self):
+        try:
+            roi = None
+            if self.roiSpec.text().strip():
+                roi = RegionOfInterest.parse(self.roiSpec.text(), self.decoder)
+        except ValueError as e:
+            self.statusBar().showMessage(f"Invalid ROI: {str(e)}")
+            return
+
+        def applied(future):
+            try:
+                future.result()
+            except Exception as e:
+                self.statusBar().showMessage(f"Failed to apply ROI: {str(e)}")
+                return
+            if roi is None:
+                self.statusBar().showMessage("ROI cleared, full frames are written")
+            elif self.fpga:
+                fraction = roi.fraction(
+                    self.fpga.CHANNEL_COUNT, self.fpga.NDVALID_READ // 2
+                )
+                self.statusBar().showMessage(
+                    f"ROI applied, {fraction:.1%} of each frame is written"
+                )
             else:
-                self.statusBar().showMessage("Hard reset failed")
-        except Exception as e:
-            self.statusBar().showMessage(f"Error during hard reset: {str(e)}")
+                self.statusBar().showMessage("ROI applied")
+
+        self.run_device(
+            self.device.set_roi(roi, timeout=self.command_timeout), applied
+        )
+
+    def qt_objects(self):
+        alive = Counter()
+        deleted = Counter()
+        for obj in gc.get_objects():
+            if isinstance(obj, QObject):
+                counts = deleted if sip.isdeleted(obj) else alive
+                counts[type(obj).__name__] += 1
+        lines = [f"Live wrappers: {sum(alive.values())}"]
+        lines += [f"  {name}: {count}" for name, count in alive.most_common(25)]
+        lines.append(f"Wrappers of deleted objects: {sum(deleted.values())}")
+        lines += [f"  {name}: {count}" for name, count in deleted.most_common(25)]
+        running = [
+            obj
+            for obj in gc.get_objects()
+            if isinstance(obj, QThread) and not sip.isdeleted(obj) and obj.isRunning()
+        ]
+        lines.append(f"Running QThreads: {len(running)}")
+        return lines
+
+    def toggle_diagnostics(self, checked):
+        if checked:
+            self.diagnostics.report_dir = self.save_path
+            self.diagnostics.start()
+            self.statusBar().showMessage("Diagnostics started")
+
+            def profiled(future):
+                try:
+                    name = future.result()
+                except Exception as e:
+                    self.statusBar().showMessage(
+                        f"Device thread is not profiled: {str(e)}"
+                    )
+                    return
+                if name is None:
+                    self.statusBar().showMessage(
+                        "Device thread is not profiled, see the report for details"
+                    )
+
+            self.run_device(
+                self.device.submit(
+                    self.diagnostics.profile_thread, timeout=self.command_timeout
+                ),
+                profiled,
+            )
+            return
+
+        def stopped(future):
+            try:
+                future.result()
+                path = self.diagnostics.stop()
+            except Exception as e:
+                self.statusBar().showMessage(f"Diagnostics failed: {str(e)}")
+                return
+            self.statusBar().showMessage(f"Diagnostics report saved to {path}")
+            if self.diagnostics_restart:
+                self.diagnostics_restart = False
+                self.diagnosticsMode.setChecked(True)
+
+        self.run_device(
+            self.device.submit(
+                self.diagnostics.unprofile_thread, timeout=self.command_timeout
+            ),
+            stopped,
+        )
+
+    def poll_diagnostics(self):
+        command = Diagnostics.pending_request()
+        if command == "on":
+            self.diagnosticsMode.setChecked(True)
+        elif command == "off":
+            self.diagnosticsMode.setChecked(False)
+        elif command == "report" and self.diagnosticsMode.isChecked():
+            self.diagnosticsMode.setChecked(False)
+            self.diagnostics_restart = True
+
+    def capture_timeout(self):
+        return self.command_timeout * max(
+            1, self.fpga.NDVALID_READ / self.fpga.chunk_reads
+        )
+
+    def adc_scale(self):
+        if self.fpga:
+            return self.fpga.adc_scale
+        return FPGAControl.adc_scale_for(
+            self.ADCrange.currentText(), int(self.Format.currentText()[:-4])
+        )
+
+    def convert_adc(self, value):
+        return value * self.adc_scale()
+
+    def run_device(self, future, callback):
+        future.add_done_callback(lambda f: self.device_done.emit(callback, f))
+
+    def closeEvent(self, event):
+        if self.diagnostics.enabled:
+            wait(
+                [self.device.submit(self.diagnostics.unprofile_thread)],
+                self.command_timeout,
+            )
+            self.diagnostics.stop()
+        if self.schedule is not None:
+            self.schedule.stop()
+        if self.scan is not None:
+            self.scan.stop()
+        self.device.set_publisher(None)
+        self.device.close(self.command_timeout)
+        self.pipeline_executor.shutdown(wait=False, cancel_futures=True)
+        self.run_browser.shutdown()
+        super().closeEvent(event)
 
     def update_time(self):
         try:
@@ -335,7 +793,11 @@ class Ui(QMainWindow):
                     file_name = self.saveFileName.text() or "file"
                     self.thread = QThread()
                     self.worker = ReaderWorker(
-                        self.fpga, folder_path, file_name, numFiles
+                        self.device,
+                        folder_path,
+                        file_name,
+                        numFiles,
+                        self.capture_timeout(),
                     )
                     self.worker.moveToThread(self.thread)
 
@@ -360,11 +822,12 @@ class Ui(QMainWindow):
                             "image_data",
                             True,
                             f"{folder_path}/{self.readFilePath.text()}",
+                            rebuild=True,
                         )
                     )
-                    self.worker.finished.connect(self.build_image)
-
-                    self.worker.finished.connect(self.build_image)
+                    self.worker.finished.connect(
+                        lambda: self.diagnostics.snapshot("record_data")
+                    )
                     self.thread.finished.connect(self.thread.deleteLater)
                     self.thread.finished.connect(self.progressBar.hide)
                     self.thread.start()
@@ -374,8 +837,150 @@ class Ui(QMainWindow):
         else:
             self.statusBar().showMessage("Please update registers first")
 
+    def record_histogram(self):
+        if not self.fpga:
+            self.statusBar().showMessage("Please update registers first")
+            return
+        try:
+            numFrames = int(self.nFiles.text())
+            if numFrames <= 0:
+                raise ValueError
+        except ValueError:
+            self.statusBar().showMessage("Invalid number of files")
+            return
+
+        self.histogram = AmplitudeHistogram(
+            self.fpga.CHANNEL_COUNT, self.histogram_bins, 0, 2**self.fpga.BIT_RATE
+        )
+        file_name = self.saveFileName.text() or "file"
+        self.histogram_viewer = HistogramViewer(
+            self.histogram, self.fpga.convert_adc, self
+        )
+        self.histogram_viewer.show()
+
+        self.progressBar.setMaximum(numFrames)
+        self.progressBar.setValue(0)
+        self.progressBar.show()
+        self.histogram_thread = QThread()
+        self.histogram_worker = HistogramWorker(
+            self.device,
+            self.histogram,
+            numFrames,
+            os.path.join(self.save_path, f"{file_name}_hist.npz"),
+            self.capture_timeout(),
+        )
+        self.histogram_worker.moveToThread(self.histogram_thread)
+
+        self.histogram_thread.started.connect(self.histogram_worker.run)
+        self.histogram_worker.progress.connect(self.progressBar.setValue)
+        self.histogram_worker.status.connect(self.statusBar().showMessage)
+        self.histogram_worker.updated.connect(self.histogram_viewer.refresh)
+        self.histogram_worker.finished.connect(self.histogram_thread.quit)
+        self.histogram_worker.finished.connect(self.histogram_worker.deleteLater)
+        self.histogram_worker.finished.connect(
+            lambda: self.diagnostics.snapshot("histogram")
+        )
+        self.histogram_thread.finished.connect(self.histogram_thread.deleteLater)
+        self.histogram_thread.finished.connect(self.progressBar.hide)
+        self.histogram_thread.start()
+
+    def run_scan(self):
+        if self.scan is not None:
+            self.scan.stop()
+            self.statusBar().showMessage("Stopping scan")
+            return
+        if not self.fpga:
+            self.statusBar().showMessage("Please update registers first")
+            return
+        try:
+            scan = ParameterScan(
+                self.fpga,
+                ParameterScan.parse_grid(self.scanGrid.text()),
+                int(self.nFiles.text()),
+                self.save_path,
+                self.saveFileName.text() or "file",
+            )
+        except ValueError as e:
+            self.statusBar().showMessage(f"Invalid scan: {str(e)}")
+            return
+
+        self.scan = scan
+        self.runScan.setText("Stop scan")
+        self.progressBar.setMaximum(scan.total_frames)
+        self.progressBar.setValue(0)
+        self.progressBar.show()
+        self.scan_thread = QThread()
+        self.scan_worker = ScanWorker(self.device, scan, self.capture_timeout())
+        self.scan_worker.moveToThread(self.scan_thread)
+
+        self.scan_thread.started.connect(self.scan_worker.run)
+        self.scan_worker.progress.connect(self.progressBar.setValue)
+        self.scan_worker.status.connect(self.statusBar().showMessage)
+        self.scan_worker.finished.connect(self.scan_thread.quit)
+        self.scan_worker.finished.connect(self.scan_finished)
+        self.scan_worker.finished.connect(self.scan_worker.deleteLater)
+        self.scan_thread.finished.connect(self.scan_thread.deleteLater)
+        self.scan_thread.finished.connect(self.progressBar.hide)
+        self.scan_thread.start()
+
+    def scan_finished(self):
+        self.scan = None
+        self.diagnostics.snapshot("scan")
+        self.runScan.setText("Run scan")
+
+    def run_schedule(self):
+        if self.schedule is not None:
+            self.schedule.stop()
+            self.statusBar().showMessage("Stopping schedule")
+            return
+        if not self.fpga:
+            self.statusBar().showMessage("Please update registers first")
+            return
+        try:
+            schedule = AcquisitionSchedule(
+                float(self.scheduleInterval.text()),
+                int(self.nFiles.text()),
+                burst=int(self.scheduleBurst.text()),
+            )
+        except ValueError as e:
+            self.statusBar().showMessage(f"Invalid schedule: {str(e)}")
+            return
+
+        self.schedule = schedule
+        self.runSchedule.setText("Stop schedule")
+        self.progressBar.setMaximum(schedule.total_frames)
+        self.progressBar.setValue(0)
+        self.progressBar.show()
+        self.schedule_thread = QThread()
+        self.schedule_worker = ScheduleWorker(
+            self.device,
+            schedule,
+            self.save_path,
+            self.saveFileName.text() or "file",
+            self.capture_timeout(),
+        )
+        self.schedule_worker.moveToThread(self.schedule_thread)
+
+        self.schedule_thread.started.connect(self.schedule_worker.run)
+        self.schedule_worker.progress.connect(self.progressBar.setValue)
+        self.schedule_worker.status.connect(self.statusBar().showMessage)
+        self.schedule_worker.finished.connect(self.schedule_thread.quit)
+        self.schedule_worker.finished.connect(self.schedule_finished)
+        self.schedule_worker.finished.connect(self.schedule_worker.deleteLater)
+        self.schedule_thread.finished.connect(self.schedule_thread.deleteLater)
+        self.schedule_thread.finished.connect(self.progressBar.hide)
+        self.schedule_thread.start()
+
+    def schedule_finished(self):
+        self.schedule = None
+        self.diagnostics.snapshot("schedule")
+        self.runSchedule.setText("Run schedule")
+        if self.schedule_worker.readFilePath:
+            self.load_trace_file(
+                os.path.join(self.save_path, self.schedule_worker.readFilePath)
+            )
+
     def load_trace_file(self, file_path=None):
-        self.file_data = {}
         if not file_path:
             options = QFileDialog.Options()
             file_path, _ = QFileDialog.getOpenFileName(
@@ -389,59 +994,95 @@ class Ui(QMainWindow):
                 return
 
         try:
+            self.trace_frame = self.run_browser.open(file_path)
             self.readFilePath.setText(file_path.split("/")[-1])
-            with open(file_path) as f:
-                lines = f.readlines()
-                for line in lines:
-                    if line.split(",")[0] not in self.file_data:
-                        self.file_data[line.split(",")[0]] = [float(line.split(",")[2])]
-                    else:
-                        self.file_data[line.split(",")[0]].append(
-                            float(line.split(",")[2])
-                        )
+            self.update_run_slider()
+            self.trace_channels.setStringList(
+                [
+                    f"{channel + 1}{side}"
+                    for side in Frame.sides
+                    for channel in range(self.trace_frame.channels)
+                ]
+            )
             if self.traceNumber.currentText() == "--":
                 self.traceNumber.setCurrentText("Mean value")
             self.plot_trace()
         except ValueError:
             self.statusBar().showMessage("Invalid file")
 
+    def update_run_slider(self):
+        position = self.run_browser.position
+        self.runSlider.blockSignals(True)
+        self.runSlider.setRange(0, max(len(self.run_browser) - 1, 0))
+        self.runSlider.setValue(position)
+        self.runSlider.blockSignals(False)
+        self.runSlider.setToolTip(f"{position + 1}/{len(self.run_browser)}")
+
+    def browse_run(self, position):
+        if not len(self.run_browser) or position == self.run_browser.position:
+            return
+        file_path = self.run_browser.path(position)
+        self.load_trace_file(file_path)
+        self.load_file(
+            "image_file",
+            self.imageFileLabel,
+            "image_data",
+            True,
+            file_path,
+            rebuild=True,
+        )
+
+    def trace_channel(self, trace):
+        match = re.fullmatch(r"0*(\d+)([AB])", trace.strip().upper())
+        if not match:
+            return None
+        channel = int(match.group(1)) - 1
+        if not 0 <= channel < self.trace_frame.channels:
+            return None
+        return Frame.sides.index(match.group(2)), channel
+
     def plot_trace(self):
-        if not len(self.file_data) == 0:
-            self.graphWidget.clear()
+        if self.trace_frame is not None:
             trace = self.traceNumber.currentText()
-            if not (trace == "--"):
+            if trace == "--":
+                self.graphWidget.clear()
+                return
 
-                if trace == "Mean value":
-                    self.graphWidget.setLabel("bottom", "Channel")
-                    x = list(range(512))
-                    sorted_keys = sorted(
-                        self.file_data.keys(), key=lambda x: (x[-1], int(x[:-1]))
-                    )
-                    y = [
-                        self.fpga.convert_adc(np.mean(self.file_data[key]))
-                        for key in sorted_keys
-                    ]
-                    color = "r"
-                else:
-                    self.graphWidget.setLabel("bottom", "Time")
-                    prefix = "0" if int(trace[:-1]) < 10 else ""
-                    x = list(range(512))
-                    y = self.fpga.convert_adc(
-                        np.array(self.file_data[f"{prefix}{trace}"])
-                    )
-                    color = "b"
-
-                self.graphWidget.plot(
-                    x,
-                    y,
-                    pen=pg.mkPen(color, width=1),
-                    symbol="o",
-                    symbolSize=10,
-                    symbolBrush=color,
-                )
+            samples = self.trace_frame.samples
+            if trace == "Mean value":
+                self.graphWidget.setLabel("bottom", "Channel")
+                samples = samples.reshape(-1, self.trace_frame.length)
+                present = ~np.isnan(samples).all(axis=-1)
+                y = self.convert_adc(np.nanmean(samples[present], axis=-1))
+                color = "r"
+            else:
+                channel = self.trace_channel(trace)
+                if channel is None:
+                    return
+                self.graphWidget.setLabel("bottom", "Time")
+                y = self.convert_adc(samples[channel])
+                color = "b"
+
+            self.graphWidget.clear()
+            self.graphWidget.plot(
+                np.arange(len(y)),
+                y,
+                pen=pg.mkPen(color, width=1),
+                symbol="o",
+                symbolSize=10,
+                symbolBrush=color,
+            )
+            if trace != "Mean value":
+                self.show_edge_lines()
 
     def load_file(
-        self, file_name_attr, label, data_attr, update_dark=False, file_path=None
+        self,
+        file_name_attr,
+        label,
+        data_attr,
+        update_dark=False,
+        file_path=None,
+        rebuild=False,
     ):
         if not file_path:
             options = QFileDialog.Options()
@@ -456,55 +1097,123 @@ class Ui(QMainWindow):
                 return
         try:
             setattr(self, file_name_attr, file_path)
-            with open(file_path) as f:
-                peaks = {}
-                for i, line in enumerate(f.readlines()):
-                    if line.split(",")[0] not in peaks:
-                        peaks[line.split(",")[0]] = [
-                            self.fpga.convert_adc(float(line.split(",")[2]))
-                        ]
-                    else:
-                        peaks[line.split(",")[0]].append(
-                            self.fpga.convert_adc(float(line.split(",")[2]))
-                        )
-                try:
-                    if (
-                        int(self.edgeLeft.text()) < 0
-                        or int(self.edgeRight.text()) > 512
-                        or int(self.edgeLeft.text()) >= int(self.edgeRight.text())
-                    ):
-                        raise ValueError
-                    for key, value in peaks.items():
-                        right_mean = np.mean(value[int(self.edgeRight.text()) :])
-                        left_mean = np.mean(value[: int(self.edgeLeft.text())])
-                        peaks[key] = (right_mean - left_mean, left_mean)
-                except ValueError:
-                    self.statusBar().showMessage("Invalid edge values")
-                    return np.zeros((16, 16))
-
-                array_image = np.zeros((16, 16))
-                array_dark = np.zeros((16, 16))
-                for i in range(16):
-                    for j in range(16):
-                        if self.decoder_matrix[i, j] >= 10:
-                            array_image[i, j] = peaks[f"{self.decoder_matrix[i,j]}A"][0]
-                            array_dark[i, j] = peaks[f"{self.decoder_matrix[i,j]}A"][1]
-                        else:
-                            array_image[i, j] = peaks[f"0{self.decoder_matrix[i,j]}A"][
-                                0
-                            ]
-                            array_dark[i, j] = peaks[f"0{self.decoder_matrix[i,j]}A"][1]
-                array_image = np.rot90(array_image, 3)
-                array_dark = np.rot90(array_dark, 3)
-
-                setattr(self, data_attr, array_image)
-                if update_dark:
-                    setattr(self, "dark_current_data", array_dark)
-
+            frame = self.run_browser.cache.get(file_path)
+            self.frames[data_attr] = frame
+            self.extractors[data_attr] = (SignalExtractor(frame.samples), update_dark)
+            self.extract_image(data_attr, rebuild)
             label.setText(file_path.split("/")[-1])
         except ValueError:
             self.statusBar().showMessage("Invalid file")
 
+    def extraction_settings(self):
+        method = self.extractionMethod.currentText()
+        edges = None
+        if method == "Multi-step":
+            edges = tuple(
+                int(edge) for edge in self.stepEdges.text().split(",") if edge.strip()
+            )
+        return method, int(self.edgeLeft.text()), int(self.edgeRight.text()), edges
+
+    def extraction_pipelines(self, method, edge_left, edge_right, edges=None):
+        adc_scale = self.adc_scale()
+        key = (method, edge_left, edge_right, edges, adc_scale, self.decoder)
+        if key != self.pipeline_key:
+            stages = (Calibrate(adc_scale), Decode(self.decoder))
+            self.pipelines = tuple(
+                Pipeline(
+                    Extract(method, edge_left, edge_right, baseline, edges),
+                    *stages,
+                    executor=self.pipeline_executor,
+                )
+                for baseline in (False, True)
+            )
+            self.pipeline_key = key
+        return self.pipelines
+
+    def run_pipeline(self, future, callback):
+        future.add_done_callback(lambda f: self.pipeline_done.emit(callback, f))
+
+    def extract_image(self, data_attr, rebuild=False):
+        extractor, update_dark = self.extractors[data_attr]
+        try:
+            pipelines = self.extraction_pipelines(*self.extraction_settings())
+        except ValueError as e:
+            self.statusBar().showMessage(f"Invalid edge values: {str(e)}")
+            return False
+
+        request = self.extraction_requests.get(data_attr, 0) + 1
+        self.extraction_requests[data_attr] = request
+        futures = [
+            pipeline.submit(extractor)
+            for pipeline in pipelines[: 2 if update_dark else 1]
+        ]
+
+        def extracted(future):
+            if self.extraction_requests.get(data_attr) != request:
+                return
+            try:
+                results = [future.result() for future in futures]
+            except ValueError as e:
+                self.statusBar().showMessage(f"Invalid edge values: {str(e)}")
+                return
+            setattr(self, data_attr, results[0])
+            if update_dark:
+                self.dark_current_data = results[1]
+            if rebuild:
+                self.build_image()
+
+        self.run_pipeline(futures[-1], extracted)
+        return True
+
+    def update_extraction(self):
+        self.show_edge_lines()
+        data_attrs = list(self.extractors)
+        for data_attr in data_attrs:
+            self.extract_image(data_attr, data_attr == data_attrs[-1])
+
+    def show_edge_lines(self):
+        try:
+            edges = (int(self.edgeLeft.text()), int(self.edgeRight.text()))
+        except ValueError:
+            return
+        visible = (
+            self.trace_frame is not None
+            and self.trace_channel(self.traceNumber.currentText()) is not None
+        )
+        for line, edge in zip(self.edge_lines, edges):
+            line.blockSignals(True)
+            line.setValue(edge)
+            line.blockSignals(False)
+            if visible and line.scene() is None:
+                self.graphWidget.addItem(line)
+
+    def drag_edges(self, line):
+        edit = self.edgeLeft if line is self.edge_lines[0] else self.edgeRight
+        edit.setText(str(int(round(line.value()))))
+
+    def show_cube(self):
+        frame = self.frames.get("image_data")
+        if self.cube_viewer is not None:
+            self.cube_viewer.close()
+        self.cube_viewer = CubeViewer(
+            self.decoder,
+            self.convert_adc,
+            frame.samples if frame else None,
+            self,
+        )
+        self.cube_viewer.show()
+
+    def image_shape(self):
+        return self.decoder.shape if self.decoder else self.default_image_shape
+
+    def reset_images(self):
+        for item, view in (
+            (self.img_item, self.image_view),
+            (self.mix_img_item, self.mix_view),
+        ):
+            item.setImage(np.zeros(self.image_shape()))
+            view.setRange(item.boundingRect(), padding=0)
+
     def load_decoder_matrix(self, file_path=None):
         if not file_path:
             options = QFileDialog.Options()
@@ -518,14 +1227,78 @@ class Ui(QMainWindow):
             if not file_path:
                 return
         try:
-            with open(file_path) as f:
-                lines = f.readlines()
-                for i, line in enumerate(lines):
-                    self.decoder_matrix[i, :] = list(map(int, line.split()))
+            self.decoder = DecoderMap.from_file(file_path)
+            self.decoder_path = file_path
+            mask_path = BadPixelMap.mask_path(file_path)
+            self.bad_pixels = (
+                BadPixelMap.load(mask_path, self.decoder.max_channel)
+                if os.path.isfile(mask_path)
+                else None
+            )
             self.decoderMatrixLabel.setText(file_path.split("/")[-1])
+            self.reset_images()
+            self.update_extraction()
         except ValueError:
             self.statusBar().showMessage("Invalid file")
 
+    def detect_bad_pixels(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Select Files", "", "Text Files (*.txt);;All Files (*)"
+        )
+        if not file_paths:
+            return
+        try:
+            values = []
+            for file_path in file_paths:
+                extractor = SignalExtractor(Frame.from_file(file_path).samples)
+                value, _ = extractor.extract(*self.extraction_settings())
+                values.append(value)
+            channels = min(value.shape[1] for value in values)
+            self.bad_pixels = BadPixelMap.detect(
+                np.stack([value[:, :channels] for value in values])
+            )
+            self.bad_pixels.save(BadPixelMap.mask_path(self.decoder_path))
+        except ValueError as e:
+            self.statusBar().showMessage(f"Bad pixel detection failed: {str(e)}")
+            return
+        self.statusBar().showMessage(f"{self.bad_pixels.count} bad pixels found")
+        self.update_extraction()
+
+    def mask_stage(self):
+        if self.bad_pixels is None:
+            return None
+        return Mask(self.bad_pixels.interpolator(self.decoder))
+
+    def display_pipelines(self):
+        key = (
+            self.image_scale(),
+            self.bad_pixels,
+            self.decoder,
+            self.useThreshold.isChecked(),
+        )
+        if key != self.display_key:
+            scale, _, _, threshold = key
+            mask = self.mask_stage()
+            self.displays = (
+                Pipeline(Scale(scale), mask),
+                Pipeline(mask, Threshold(1.0) if threshold else None),
+            )
+            self.display_key = key
+        return self.displays
+
+    def image_scale(self):
+        return 1e15 / (
+            float(self.pixelX.text())
+            * float(self.pixelY.text())
+            * float(self.ConvLowInt.text())
+        )
+
+    def image_levels(self, image):
+        finite = image[np.isfinite(image)]
+        if finite.size == 0:
+            return np.nan, np.nan
+        return finite.min(), finite.max()
+
     def build_image(self):
         if self.useNormalization.isChecked():
             if (not self.image_file) or (not self.open_beam_file):
@@ -533,90 +1306,77 @@ class Ui(QMainWindow):
                     "Please select both image and open beam files"
                 )
             else:
-                left_image = self.image_data / self.open_beam_data
-
-                if self.useThreshold.isChecked():
-                    left_image[left_image > 1] = 1
+                _, normalized = self.display_pipelines()
+                left_image = normalized(Normalize(self.open_beam_data)(self.image_data))
 
                 self.img_item.setImage(left_image)
-                if np.isnan(left_image.min()) or np.isnan(left_image.max()):
+                low, high = self.image_levels(left_image)
+                if np.isnan(low) or np.isnan(high):
                     self.img_item.setLevels((0, 1))
                     self.color_bar.setLevels((0, 1))
                     self.imageUpperScale.setText("1")
                     self.imageLowScale.setText("0")
                 else:
-                    self.img_item.setLevels((left_image.min(), left_image.max()))
-                    self.color_bar.setLevels((left_image.min(), left_image.max()))
-                self.imageUpperScale.setText(f"{left_image.max()}")
-                self.imageLowScale.setText(f"{left_image.min()}")
+                    self.img_item.setLevels((low, high))
+                    self.color_bar.setLevels((low, high))
+                self.imageUpperScale.setText(f"{high}")
+                self.imageLowScale.setText(f"{low}")
         else:
             if not self.image_file:
                 self.statusBar().showMessage("Please select image file")
             else:
-                left_image = (
-                    self.image_data
-                    / float(self.pixelX.text())
-                    / float(self.pixelY.text())
-                    / float(self.ConvLowInt.text())
-                    * 1e15
-                )
+                scaled, _ = self.display_pipelines()
+                left_image = scaled(self.image_data)
                 self.img_item.setImage(left_image)
-                if np.isnan(left_image.min()) or np.isnan(left_image.max()):
+                low, high = self.image_levels(left_image)
+                if np.isnan(low) or np.isnan(high):
                     self.img_item.setLevels((0, 1))
                     self.color_bar.setLevels((0, 1))
                     self.imageUpperScale.setText("1")
                     self.imageLowScale.setText("0")
                 else:
-                    self.img_item.setLevels((left_image.min(), left_image.max()))
-                    self.color_bar.setLevels((left_image.min(), left_image.max()))
-                    self.imageUpperScale.setText(f"{left_image.max()}")
-                    self.imageLowScale.setText(f"{left_image.min()}")
+                    self.img_item.setLevels((low, high))
+                    self.color_bar.setLevels((low, high))
+                    self.imageUpperScale.setText(f"{high}")
+                    self.imageLowScale.setText(f"{low}")
 
         if self.darkCurrent.isChecked():
             if not self.image_file:
                 self.statusBar().showMessage("Please select image file")
             else:
-                right_image = (
-                    self.dark_current_data
-                    / float(self.pixelX.text())
-                    / float(self.pixelY.text())
-                    / float(self.ConvLowInt.text())
-                    * 1e15
-                )
+                scaled, _ = self.display_pipelines()
+                right_image = scaled(self.dark_current_data)
                 self.mix_img_item.setImage(right_image)
-                if np.isnan(right_image.min()) or np.isnan(right_image.max()):
+                low, high = self.image_levels(right_image)
+                if np.isnan(low) or np.isnan(high):
                     self.mix_img_item.setLevels((0, 1))
                     self.mix_color_bar.setLevels((0, 1))
                     self.mixUpperScale.setText("1")
                     self.mixLowScale.setText("0")
                 else:
-                    self.mix_img_item.setLevels((right_image.min(), right_image.max()))
-                    self.mix_color_bar.setLevels((right_image.min(), right_image.max()))
-                    self.mixUpperScale.setText(f"{right_image.max()}")
-                    self.mixLowScale.setText(f"{right_image.min()}")
+                    self.mix_img_item.setLevels((low, high))
+                    self.mix_color_bar.setLevels((low, high))
+                    self.mixUpperScale.setText(f"{high}")
+                    self.mixLowScale.setText(f"{low}")
 
         if self.openBeam.isChecked():
             if not self.open_beam_file:
                 self.statusBar().showMessage("Please select open beam file")
             else:
-                right_image = (
-                    self.open_beam_data
-                    / float(self.pixelX.text())
-                    / float(self.pixelY.text())
-                    / float(self.ConvLowInt.text())
-                    * 1e15
-                )
+                scaled, _ = self.display_pipelines()
+                right_image = scaled(self.open_beam_data)
                 self.mix_img_item.setImage(right_image)
-                if np.isnan(right_image.min()) or np.isnan(right_image.max()):
+                low, high = self.image_levels(right_image)
+                if np.isnan(low) or np.isnan(high):
                     self.mix_img_item.setLevels((0, 1))
                     self.mix_color_bar.setLevels((0, 1))
                     self.mixUpperScale.setText("1")
                     self.mixLowScale.setText("0")
                 else:
-                    self.mix_img_item.setLevels((right_image.min(), right_image.max()))
-                    self.mix_color_bar.setLevels((right_image.min(), right_image.max()))
-                    self.mixUpperScale.setText(f"{right_image.max()}")
-                    self.mixLowScale.setText(f"{right_image.min()}")
+                    self.mix_img_item.setLevels((low, high))
+                    self.mix_color_bar.setLevels((low, high))
+                    self.mixUpperScale.setText(f"{high}")
+                    self.mixLowScale.setText(f"{low}")
 
     def change_scales(self):
         if self.imageUpperScale.text() and self.imageLowScale.text():
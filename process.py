@@ -0,0 +1,48 @@
+from tools import (
+    FPGAControl,
+    DecoderMap,
+    BadPixelMap,
+    SignalExtractor,
+    Pipeline,
+    Extract,
+    Calibrate,
+    Decode,
+    Mask,
+)
+import numpy as np
+import argparse
+import os
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build images from data files")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--decoder", default="decoder_matrix.txt")
+    parser.add_argument("--side", default="A", choices=DecoderMap.sides)
+    parser.add_argument("--rotation", type=int, default=3)
+    parser.add_argument("--flip", action="store_true")
+    parser.add_argument("--edges", type=int, nargs=2, default=(156, 356))
+    parser.add_argument("--method", default="Step", choices=SignalExtractor.methods)
+    parser.add_argument("--step-edges", type=int, nargs="+", default=None)
+    parser.add_argument("--adc-range", default="150.0")
+    parser.add_argument("--bits", type=int, default=20)
+    parser.add_argument("--output", default="images.npy")
+    args = parser.parse_args()
+
+    decoder = DecoderMap.from_file(args.decoder, args.side, args.rotation, args.flip)
+    mask_path = BadPixelMap.mask_path(args.decoder)
+    mask = None
+    if os.path.isfile(mask_path):
+        bad_pixels = BadPixelMap.load(mask_path, decoder.max_channel)
+        mask = Mask(bad_pixels.interpolator(decoder))
+
+    pipeline = Pipeline(
+        Extract(args.method, *args.edges, edges=args.step_edges),
+        Calibrate(FPGAControl.adc_scale_for(args.adc_range, args.bits)),
+        Decode(decoder),
+        mask,
+    )
+    images = np.stack(list(pipeline.run_files(args.files)))
+    pipeline.shutdown()
+    np.save(args.output, images)
+    print(f"Saved {len(images)} images to {args.output}")
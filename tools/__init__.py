@@ -1 +1,26 @@
 from .fpga_control import FPGAControl
+from .decoder import DecoderMap
+from .frame import Frame
+from .extraction import SignalExtractor
+from .scan import ParameterScan
+from .device import DeviceThread
+from .cube import TimeCube
+from .bad_pixels import BadPixelMap, NeighbourInterpolator
+from .metadata import MetadataLog
+from .shared_frames import FramePublisher, FrameSubscriber
+from .pipeline import (
+    Pipeline,
+    Calibrate,
+    Extract,
+    Decode,
+    Scale,
+    Normalize,
+    Threshold,
+    Mask,
+)
+from .histogram import AmplitudeHistogram
+from .text_writer import TextFrameWriter
+from .run_browser import FrameCache, RunSeries, RunBrowser
+from .schedule import AcquisitionSchedule
+from .roi import RegionOfInterest
+from .diagnostics import Diagnostics
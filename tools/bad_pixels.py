@@ -0,0 +1,114 @@
+import os
+import numpy as np
+
+
+class BadPixelMap:
+    sides = ("A", "B")
+
+    def __init__(self, bad):
+        self.bad = np.asarray(bad, dtype=bool)
+        self._decoder = None
+        self._interpolator = None
+
+    @property
+    def count(self):
+        return int(self.bad.sum())
+
+    @staticmethod
+    def mask_path(decoder_path):
+        root, ext = os.path.splitext(decoder_path)
+        return f"{root}_badpixels{ext or '.txt'}"
+
+    @classmethod
+    def detect(cls, values, sigma=5.0):
+        values = np.asarray(values, dtype=float)
+        if values.ndim != 3 or values.shape[0] < 2:
+            raise ValueError("Bad pixel detection needs at least two frames")
+        with np.errstate(invalid="ignore"):
+            mean = values.mean(axis=0)
+            std = values.std(axis=0)
+        bad = ~np.isfinite(mean) | ~np.isfinite(std) | (std == 0)
+
+        for stat, two_sided in ((mean, True), (std, False)):
+            for side in range(2):
+                good = ~bad[side]
+                if good.sum() < 3:
+                    continue
+                median = np.median(stat[side, good])
+                mad = 1.4826 * np.median(np.abs(stat[side, good] - median))
+                if mad == 0:
+                    continue
+                deviation = stat[side] - median
+                if two_sided:
+                    deviation = np.abs(deviation)
+                bad[side] |= deviation > sigma * mad
+        return cls(bad)
+
+    @classmethod
+    def load(cls, file_path, channels):
+        bad = np.zeros((2, channels), dtype=bool)
+        with open(file_path) as f:
+            for token in f.read().split():
+                if token[-1] not in cls.sides:
+                    raise ValueError(f"Invalid bad pixel entry: {token}")
+                channel = int(token[:-1])
+                if 1 <= channel <= channels:
+                    bad[cls.sides.index(token[-1]), channel - 1] = True
+        return cls(bad)
+
+    def save(self, file_path):
+        sides, channels = np.nonzero(self.bad)
+        with open(file_path, "w") as f:
+            for side, channel in zip(sides, channels):
+                f.write(f"{channel + 1}{self.sides[side]}\n")
+
+    def image_mask(self, decoder):
+        channels = max(self.bad.shape[1], decoder.max_channel)
+        bad = np.zeros((2, channels), dtype=bool)
+        bad[:, : self.bad.shape[1]] = self.bad
+        mask = bad.ravel()[decoder.index(channels)].reshape(decoder.shape)
+        return mask | decoder.dead
+
+    def interpolator(self, decoder):
+        if self._decoder is not decoder:
+            self._interpolator = NeighbourInterpolator(self.image_mask(decoder))
+            self._decoder = decoder
+        return self._interpolator
+
+
+class NeighbourInterpolator:
+    offsets = [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if (i, j) != (0, 0)]
+
+    def __init__(self, mask):
+        self.mask = np.asarray(mask, dtype=bool)
+        rows, cols = self.mask.shape
+        bad_rows, bad_cols = np.nonzero(self.mask)
+        self.targets = bad_rows * cols + bad_cols
+
+        target_idx, sources = [], []
+        for di, dj in self.offsets:
+            r, c = bad_rows + di, bad_cols + dj
+            valid = (r >= 0) & (r < rows) & (c >= 0) & (c < cols)
+            valid[valid] &= ~self.mask[r[valid], c[valid]]
+            target_idx.append(np.nonzero(valid)[0])
+            sources.append(r[valid] * cols + c[valid])
+        target_idx = np.concatenate(target_idx)
+        sources = np.concatenate(sources)
+
+        order = np.argsort(target_idx, kind="stable")
+        self.sources = sources[order]
+        counts = np.bincount(target_idx, minlength=len(self.targets))
+        self.filled = counts > 0
+        self.starts = (np.cumsum(counts) - counts)[self.filled]
+        self.counts = counts[self.filled]
+
+    def __call__(self, image):
+        image = np.array(image, dtype=float)
+        if not len(self.targets):
+            return image
+        flat = image.reshape(*image.shape[:-2], -1)
+        flat[..., self.targets[~self.filled]] = np.nan
+        if len(self.sources):
+            sums = np.add.reduceat(flat[..., self.sources], self.starts, axis=-1)
+            flat[..., self.targets[self.filled]] = sums / self.counts
+        return image
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+class TimeCube:
+    def __init__(self, samples, decoder, time_bins, relative=True):
+        samples = np.asarray(samples, dtype=float)
+        if samples.ndim == 4:
+            samples = np.moveaxis(samples, 0, -2).reshape(*samples.shape[1:3], -1)
+        length = samples.shape[-1]
+        time_bins = max(1, min(time_bins, length))
+
+        self.edges = np.linspace(0, length, time_bins + 1).astype(int)
+        binned = np.add.reduceat(samples, self.edges[:-1], axis=-1)
+        binned /= np.diff(self.edges)
+        values = np.moveaxis(binned, -1, 0)
+        if relative:
+            values = values - values[:1]
+        self.images = decoder.apply(values)
+
+    @property
+    def time_bins(self):
+        return self.images.shape[0]
+
+    def levels(self, low=1.0, high=99.0):
+        finite = self.images[np.isfinite(self.images)]
+        if finite.size == 0:
+            return 0.0, 1.0
+        lower, upper = np.percentile(finite, (low, high))
+        return (lower, upper) if upper > lower else (lower, lower + 1.0)
+
+    def lut_indices(self, levels, lut_size=256):
+        lower, upper = levels
+        scaled = (self.images - lower) * ((lut_size - 1) / (upper - lower))
+        scaled = np.nan_to_num(scaled, nan=0.0, posinf=lut_size - 1, neginf=0.0)
+        return np.clip(scaled, 0, lut_size - 1).astype(np.uint8)
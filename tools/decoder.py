@@ -0,0 +1,84 @@
+import numpy as np
+
+
+class DecoderMap:
+    sides = ("A", "B")
+    dead_tokens = ("0", "x", "X", "-")
+
+    def __init__(self, channel_map, side_map=None, rotation=3, flip=False):
+        channel_map = np.asarray(channel_map, dtype=int)
+        if channel_map.ndim != 2:
+            raise ValueError("Decoder matrix must be a 2D channel layout")
+        if side_map is None:
+            side_map = np.zeros(channel_map.shape, dtype=int)
+        side_map = np.asarray(side_map, dtype=int)
+        if side_map.shape != channel_map.shape:
+            raise ValueError("Side map does not match decoder matrix shape")
+        dead = channel_map <= 0
+
+        self.rotation = rotation
+        self.flip = flip
+
+        self.channel_map = self.orient(channel_map)
+        self.side_map = self.orient(side_map)
+        self.dead = self.orient(dead)
+        self._index_cache = {}
+
+    def orient(self, matrix):
+        matrix = np.rot90(matrix, self.rotation)
+        return np.fliplr(matrix) if self.flip else matrix
+
+    @property
+    def shape(self):
+        return self.channel_map.shape
+
+    @property
+    def max_channel(self):
+        return int(self.channel_map.max())
+
+    @classmethod
+    def from_file(cls, file_path, side="A", rotation=3, flip=False):
+        with open(file_path) as f:
+            rows = [line.split() for line in f if line.strip()]
+        if not rows or len({len(row) for row in rows}) != 1:
+            raise ValueError(f"Invalid decoder matrix: {file_path}")
+
+        channel_map = np.zeros((len(rows), len(rows[0])), dtype=int)
+        side_map = np.full(channel_map.shape, cls.sides.index(side), dtype=int)
+        for i, row in enumerate(rows):
+            for j, token in enumerate(row):
+                if token in cls.dead_tokens:
+                    continue
+                if token[-1] in cls.sides:
+                    side_map[i, j] = cls.sides.index(token[-1])
+                    token = token[:-1]
+                channel_map[i, j] = int(token)
+        return cls(channel_map, side_map, rotation, flip)
+
+    def index(self, n_channels):
+        if n_channels not in self._index_cache:
+            if self.max_channel > n_channels:
+                raise ValueError(
+                    f"Decoder needs {self.max_channel} channels, frame has {n_channels}"
+                )
+            flat = self.side_map * n_channels + self.channel_map - 1
+            flat[self.dead] = 0
+            self._index_cache[n_channels] = np.ascontiguousarray(flat.ravel())
+        return self._index_cache[n_channels]
+
+    def apply(self, values, fill=np.nan):
+        values = np.asarray(values, dtype=float)
+        if values.ndim < 2 or values.shape[-2] != 2:
+            raise ValueError("Values must have shape (..., 2, channels)")
+        if values.shape[-1] < self.max_channel:
+            missing = self.max_channel - values.shape[-1]
+            pad = np.full(values.shape[:-1] + (missing,), fill, dtype=float)
+            values = np.concatenate((values, pad), axis=-1)
+        lead = values.shape[:-2]
+        n_channels = values.shape[-1]
+        flat = values.reshape(*lead, 2 * n_channels)
+        image = np.take(flat, self.index(n_channels), axis=-1)
+        image = image.reshape(*lead, *self.shape)
+        if self.dead.any():
+            image[..., self.dead] = fill
+        return image
@@ -0,0 +1,77 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class DeviceThread(threading.Thread):
+    def __init__(self):
+        super().__init__(name="DeviceThread", daemon=True)
+        self.commands = queue.Queue()
+        self.fpga = None
+        self.publisher = None
+        self.roi = None
+
+    def submit(self, fn, *args, timeout=None, **kwargs):
+        future = Future()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.commands.put((future, deadline, fn, args, kwargs))
+        return future
+
+    def configure(self, factory, timeout=None):
+        return self.submit(self._configure, factory, timeout=timeout)
+
+    def call(self, method, *args, timeout=None, **kwargs):
+        return self.submit(self._call, method, *args, timeout=timeout, **kwargs)
+
+    def set_publisher(self, publisher, timeout=None):
+        return self.submit(self._set_publisher, publisher, timeout=timeout)
+
+    def set_roi(self, roi, timeout=None):
+        return self.submit(self._set_roi, roi, timeout=timeout)
+
+    def _configure(self, factory):
+        self.fpga = factory()
+        self.fpga.publisher = self.publisher
+        self.fpga.roi = self.roi
+        return self.fpga
+
+    def _set_publisher(self, publisher):
+        previous = self.publisher
+        self.publisher = publisher
+        if self.fpga is not None:
+            self.fpga.publisher = publisher
+        if previous is not None:
+            previous.close()
+
+    def _set_roi(self, roi):
+        self.roi = roi
+        if self.fpga is not None:
+            self.fpga.roi = roi
+
+    def _call(self, method, *args, **kwargs):
+        if self.fpga is None:
+            raise RuntimeError("Device is not configured")
+        return getattr(self.fpga, method)(*args, **kwargs)
+
+    def run(self):
+        while True:
+            command = self.commands.get()
+            if command is None:
+                break
+            future, deadline, fn, args, kwargs = command
+            if not future.set_running_or_notify_cancel():
+                continue
+            if deadline is not None and time.monotonic() > deadline:
+                future.set_exception(
+                    TimeoutError("Device command expired before it could run")
+                )
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+    def close(self, timeout=None):
+        self.commands.put(None)
+        self.join(timeout)
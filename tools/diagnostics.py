@@ -0,0 +1,234 @@
+from collections import Counter, defaultdict
+import cProfile
+import io
+import os
+import platform
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, interval=0.01):
+        super().__init__(name="StackSampler", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.ticks = Counter()
+        self.own = defaultdict(Counter)
+        self.inclusive = defaultdict(Counter)
+
+    @staticmethod
+    def location(code):
+        file_name = os.path.basename(code.co_filename)
+        return f"{file_name}:{code.co_firstlineno}({code.co_name})"
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                name = names.get(ident, f"Thread-{ident}")
+                self.ticks[name] += 1
+                self.own[name][self.location(frame.f_code)] += 1
+                seen = set()
+                while frame is not None:
+                    location = self.location(frame.f_code)
+                    if location not in seen:
+                        self.inclusive[name][location] += 1
+                        seen.add(location)
+                    frame = frame.f_back
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def report(self, limit=15):
+        lines = [f"Sampling interval: {self.interval * 1e3:.1f} ms"]
+        for name, ticks in self.ticks.most_common():
+            lines.append(f"\n[{name}] {ticks} samples")
+            for title, counters in (("own", self.own), ("inclusive", self.inclusive)):
+                lines.append(f"  {title}:")
+                lines.extend(
+                    f"    {100 * count / ticks:5.1f}%  {location}"
+                    for location, count in counters[name].most_common(limit)
+                )
+        return lines
+
+
+class Diagnostics:
+    request_name = "ddc264evm_diagnostics.request"
+    commands = ("on", "off", "report")
+    max_snapshots = 10
+    shared_profiler = sys.version_info >= (3, 12)
+    shared_profile_name = "all threads"
+
+    def __init__(self, report_dir, sample_interval=0.01, trace_frames=1):
+        self.report_dir = report_dir
+        self.sample_interval = sample_interval
+        self.trace_frames = trace_frames
+        self.enabled = False
+        self.profiles = {}
+        self.profile_errors = {}
+        self.providers = {}
+        self.snapshots = []
+        self.sampler = None
+        self.started_at = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def request_path(cls):
+        return os.path.join(tempfile.gettempdir(), cls.request_name)
+
+    @classmethod
+    def request(cls, command):
+        if command not in cls.commands:
+            raise ValueError(f"Unknown diagnostics command: {command}")
+        with open(cls.request_path(), "w") as f:
+            f.write(command)
+
+    @classmethod
+    def pending_request(cls):
+        path = cls.request_path()
+        if not os.path.isfile(path):
+            return None
+        with open(path) as f:
+            command = f.read().strip()
+        os.remove(path)
+        return command if command in cls.commands else None
+
+    def add_provider(self, name, provider):
+        self.providers[name] = provider
+
+    def start(self):
+        if self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+        self.profiles = {}
+        self.profile_errors = {}
+        self.snapshots = []
+        self.sampler = StackSampler(self.sample_interval)
+        self.sampler.start()
+        self.started_at = time.time()
+        self.enabled = True
+        self.profile_thread()
+        self.snapshot("start")
+
+    def profile_name(self):
+        if self.shared_profiler:
+            return self.shared_profile_name
+        return threading.current_thread().name
+
+    def profile_thread(self):
+        if not self.enabled:
+            return None
+        name = self.profile_name()
+        with self.lock:
+            if name in self.profiles:
+                return name
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            with self.lock:
+                self.profile_errors[threading.current_thread().name] = str(e)
+            return None
+        with self.lock:
+            self.profiles[name] = profile
+        return name
+
+    def unprofile_thread(self):
+        with self.lock:
+            profile = self.profiles.get(self.profile_name())
+        if profile is not None:
+            profile.disable()
+
+    def snapshot(self, label):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.snapshots.append((label, time.time(), tracemalloc.take_snapshot()))
+            if len(self.snapshots) > self.max_snapshots:
+                del self.snapshots[1]
+
+    def stop(self):
+        if not self.enabled:
+            return None
+        self.unprofile_thread()
+        self.snapshot("stop")
+        self.sampler.stop()
+        try:
+            path = self.write_report()
+        finally:
+            tracemalloc.stop()
+            self.enabled = False
+        return path
+
+    def section(self, title, lines):
+        return [f"\n== {title} ==", *lines]
+
+    def report(self):
+        now = time.time()
+        lines = [
+            "DDC264EVM diagnostics report",
+            f"Generated: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))}",
+            f"Duration: {now - self.started_at:.1f} s",
+            f"Process: {os.getpid()}, Python {platform.python_version()}, "
+            f"{platform.platform()}",
+        ]
+        lines += self.section(
+            "Threads",
+            [
+                f"{thread.name} (daemon={thread.daemon}, alive={thread.is_alive()})"
+                for thread in threading.enumerate()
+            ],
+        )
+        for name, provider in self.providers.items():
+            try:
+                lines += self.section(name, provider())
+            except Exception as e:
+                lines += self.section(name, [f"Provider failed: {str(e)}"])
+
+        with self.lock:
+            profiles = dict(self.profiles)
+            profile_errors = dict(self.profile_errors)
+            snapshots = list(self.snapshots)
+        for name, profile in profiles.items():
+            stream = io.StringIO()
+            stats = pstats.Stats(profile, stream=stream)
+            stats.sort_stats("cumulative").print_stats(30)
+            lines += self.section(
+                f"CPU profile: {name}", stream.getvalue().splitlines()
+            )
+        for name, error in profile_errors.items():
+            lines += self.section(f"CPU profile: {name}", [f"Not profiled: {error}"])
+        lines += self.section("Sampled stacks", self.sampler.report())
+
+        current, peak = tracemalloc.get_traced_memory()
+        memory = [f"Traced: {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB"]
+        if snapshots:
+            memory.append("Top allocations:")
+            memory += [
+                f"  {stat}" for stat in snapshots[-1][2].statistics("lineno")[:20]
+            ]
+        for (label_a, t_a, a), (label_b, t_b, b) in zip(snapshots, snapshots[1:]):
+            memory.append(f"Diff {label_a} -> {label_b} ({t_b - t_a:.1f} s):")
+            memory += [f"  {stat}" for stat in b.compare_to(a, "lineno")[:10]]
+        lines += self.section("Memory", memory)
+        return lines
+
+    def write_report(self):
+        os.makedirs(self.report_dir, exist_ok=True)
+        stem = os.path.join(self.report_dir, time.strftime("diagnostics_%Y%m%d_%H%M%S"))
+        path = f"{stem}.txt"
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = f"{stem}_{suffix}.txt"
+        with open(path, "w") as f:
+            f.write("\n".join(self.report()) + "\n")
+        return path
@@ -0,0 +1,81 @@
+import numpy as np
+
+
+class SignalExtractor:
+    methods = ("Step", "Linear baseline", "Multi-step")
+
+    def __init__(self, samples):
+        samples = np.asarray(samples, dtype=float)
+        self.length = samples.shape[-1]
+        t = np.arange(self.length, dtype=float)
+        zero = np.zeros(samples.shape[:-1] + (1,))
+        self.moments = None
+        present = ~np.isnan(samples)
+        if not present.all():
+            samples = np.where(present, samples, 0.0)
+            self.moments = [
+                np.concatenate((zero, np.cumsum(present * t**k, axis=-1)), axis=-1)
+                for k in range(3)
+            ]
+        self.sum = np.concatenate((zero, np.cumsum(samples, axis=-1)), axis=-1)
+        self.tsum = np.concatenate((zero, np.cumsum(samples * t, axis=-1)), axis=-1)
+
+    def check_edges(self, *edges):
+        bounds = (0, *edges, self.length)
+        if any(a >= b for a, b in zip(bounds[:-1], bounds[1:])):
+            raise ValueError(f"Invalid window edges: {edges}")
+
+    def window_moments(self, start, stop):
+        if self.moments is None:
+            t = np.arange(start, stop, dtype=float)
+            return stop - start, t.sum(), (t * t).sum()
+        return [m[..., stop] - m[..., start] for m in self.moments]
+
+    def window_sum(self, start, stop):
+        return self.sum[..., stop] - self.sum[..., start]
+
+    def window_mean(self, start, stop):
+        n = self.window_moments(start, stop)[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.window_sum(start, stop) / n
+
+    def linear_fit(self, start, stop):
+        n, st, stt = self.window_moments(start, stop)
+        sx = self.window_sum(start, stop)
+        stx = self.tsum[..., stop] - self.tsum[..., start]
+        denominator = n * stt - st * st
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(denominator == 0, 0.0, (n * stx - st * sx) / denominator)
+            intercept = (sx - slope * st) / n
+        return slope, intercept
+
+    def step(self, left, right):
+        self.check_edges(left, right)
+        baseline = self.window_mean(0, left)
+        return self.window_mean(right, self.length) - baseline, baseline
+
+    def linear_baseline_step(self, left, right):
+        self.check_edges(left, right)
+        slope, intercept = self.linear_fit(0, left)
+        centre = (right + self.length - 1) / 2
+        signal = self.window_mean(right, self.length)
+        return signal - (intercept + slope * centre), self.window_mean(0, left)
+
+    def multi_step(self, edges):
+        self.check_edges(*edges)
+        bounds = (0, *edges, self.length)
+        means = np.stack(
+            [self.window_mean(a, b) for a, b in zip(bounds[:-1], bounds[1:])]
+        )
+        return (means[-1] - means[0]) / (len(means) - 1), means[0]
+
+    def extract(self, method, left, right, edges=None):
+        if method == "Step":
+            return self.step(left, right)
+        if method == "Linear baseline":
+            return self.linear_baseline_step(left, right)
+        if method == "Multi-step":
+            if not edges:
+                raise ValueError("Multi-step needs plateau edges")
+            return self.multi_step(edges)
+        raise ValueError(f"Unknown extraction method: {method}")
@@ -1,10 +1,25 @@
 import os
+import time
+import zlib
 import ctypes
+import numpy as np
+from .frame import Frame
+from .metadata import MetadataLog
+from .text_writer import TextFrameWriter
 
 
 class FPGAControl:
     adc_ranges = {"12.5": (0, 0), "50.0": (0, 1), "100.0": (1, 0), "150.0": (1, 1)}
     bit_rates = {16: 0, 20: 1}
+    max_channel_value = 0x0F
+    chunk_reads = 4096
+    text_block = 65536
+    param_attrs = {
+        "CLK_HIGH": "CLC_HIGH",
+        "CLK_LOW": "CLC_LOW",
+        "DCLKWait": "DCLK_WAIT_MCLK",
+        "HARDWARE_TRIGGER": "HADWARE_TRIGGER",
+    }
 
     int16_t = ctypes.c_int16
     int32_t = ctypes.c_int32
@@ -58,25 +73,20 @@ class FPGAControl:
         self.CLKDELAY_AROUND_CONV = 0
 
         self.DDCbit13 = 0
-        self.DDCbit10 = self.adc_ranges[ADC_RANGE][0]
-        self.DDCbit9 = self.adc_ranges[ADC_RANGE][1]
-        self.DDCbit8 = self.bit_rates[BIT_RATE]
-
         self.DDCbit7 = 0
         self.DDCbit4 = 0
         self.DDCbit0 = 0
-
-        self.CFGLOW = (self.DDCbit7 << 7) + (self.DDCbit4 << 4) + self.DDCbit0
-        self.CFGHIGH = (
-            (self.DDCbit13 << 5)
-            + (self.DDCbit10 << 2)
-            + (self.DDCbit9 << 1)
-            + self.DDCbit8
-        )
+        self.set_cfg(ADC_RANGE, BIT_RATE)
 
         self.RegsIn = (self.INT * self.regsSize)()
         self.RegsOut = (self.INT * self.regsSize)()
         self.RegsEnable = (self.INT * self.regsSize)()
+        self.RegsSent = [None] * self.regsSize
+        self.metadata_logs = {}
+        self.publisher = None
+        self.writer = None
+        self.roi = None
+        self.last_capture = {}
 
         dll_path = os.path.join(
             os.path.dirname(os.path.dirname(__file__)), "DDC264EVM_IO.dll"
@@ -143,6 +153,29 @@ class FPGAControl:
         ]
         self.dll.EVM_WriteCFGFast.restype = ctypes.c_int
 
+    def set_cfg(self, ADC_RANGE, BIT_RATE):
+        self.DDCbit10 = self.adc_ranges[ADC_RANGE][0]
+        self.DDCbit9 = self.adc_ranges[ADC_RANGE][1]
+        self.DDCbit8 = self.bit_rates[BIT_RATE]
+
+        self.CFGLOW = (self.DDCbit7 << 7) + (self.DDCbit4 << 4) + self.DDCbit0
+        self.CFGHIGH = (
+            (self.DDCbit13 << 5)
+            + (self.DDCbit10 << 2)
+            + (self.DDCbit9 << 1)
+            + self.DDCbit8
+        )
+
+    @property
+    def ADC_RANGE(self):
+        return next(
+            k for k, v in self.adc_ranges.items() if v == (self.DDCbit10, self.DDCbit9)
+        )
+
+    @property
+    def BIT_RATE(self):
+        return next(k for k, v in self.bit_rates.items() if v == self.DDCbit8)
+
     def reset_regs(self):
         for i in range(self.regsSize):
             self.RegsEnable[i] = 0
@@ -152,25 +185,8 @@ class FPGAControl:
         self.RegsEnable[reg] = 1
 
     def set_regs(self):
-        if self.CHANNEL_COUNT <= 1:
-            channel_value = 0
-        elif self.CHANNEL_COUNT <= 2:
-            channel_value = 1
-        elif self.CHANNEL_COUNT <= 4:
-            channel_value = 2
-        elif self.CHANNEL_COUNT <= 8:
-            channel_value = 3
-        elif self.CHANNEL_COUNT <= 16:
-            channel_value = 4
-        elif self.CHANNEL_COUNT <= 32:
-            channel_value = 5
-        elif self.CHANNEL_COUNT <= 64:
-            channel_value = 6
-        elif self.CHANNEL_COUNT <= 128:
-            channel_value = 7
-        elif self.CHANNEL_COUNT <= 256:
-            channel_value = 8
-        else:
+        channel_value = max(self.CHANNEL_COUNT - 1, 0).bit_length()
+        if self.CHANNEL_COUNT < 0 or channel_value > self.max_channel_value:
             raise ValueError("Invalid channel count")
 
         self.CHANNEL_COUNT = int(2**channel_value)
@@ -241,6 +257,11 @@ class FPGAControl:
     def clear_triggers(self):
         return self.dll.EVM_ClearTriggers(ctypes.byref(self.USBdev))
 
+    def hard_reset(self):
+        reset_result = self.reset_ddc()
+        clear_result = self.clear_triggers()
+        return reset_result and clear_result
+
     def configure_sequence(self, cfg_high, cfg_low):
         high = self.BYTE(cfg_high)
         low = self.BYTE(cfg_low)
@@ -269,12 +290,17 @@ class FPGAControl:
         rc = self.dll.EVM_RegsTransfer(
             ctypes.byref(self.USBdev), regs_in, regs_en, regs_out
         )
+        if rc == 0:
+            for i, enabled in enumerate(RegEnable[:255]):
+                if enabled:
+                    self.RegsSent[i] = RegsIn[i] & 0xFF
         return rc, list(regs_out)
 
-    def capture_data(self, channels, reads, AorBfirst=0):
+    def capture_data(self, channels, reads, AorBfirst=0, as_array=False):
         total_samples = channels * reads
         data_arr = (self.INT * total_samples)()
         aorbfirst_c = self.INT(AorBfirst)
+        t_before = time.time_ns()
         rc = self.dll.EVM_DataCap(
             ctypes.byref(self.USBdev),
             self.INT(channels),
@@ -282,8 +308,73 @@ class FPGAControl:
             data_arr,
             ctypes.byref(aorbfirst_c),
         )
+        t_after = time.time_ns()
+        self.last_capture = {
+            "t_before_ns": t_before,
+            "t_after_ns": t_after,
+            "rc": rc,
+            "aorbfirst": aorbfirst_c.value,
+            "channels": channels,
+            "reads": reads,
+            "samples": total_samples,
+            "crc32": zlib.crc32(memoryview(data_arr)),
+        }
+        if self.publisher is not None and rc == 0:
+            self.publish(
+                np.frombuffer(data_arr, dtype=np.int32),
+                channels,
+                reads,
+                aorbfirst_c.value,
+                t_after,
+            )
+        if as_array:
+            return rc, np.frombuffer(data_arr, dtype=np.int32), aorbfirst_c.value
         return rc, list(data_arr), aorbfirst_c.value
 
+    def publish(self, data, channels, reads, aorbfirst, t_ns):
+        if self.roi is None:
+            return self.publisher.publish(data, channels, reads, aorbfirst, t_ns)
+        block, used = self.roi.capture_block(data, channels, reads)
+        start, stop = self.roi.sample_range(reads // 2)
+        return self.publisher.publish(
+            block,
+            len(used),
+            len(block),
+            aorbfirst,
+            t_ns,
+            (used, self.roi.side_idx, start, stop),
+        )
+
+    def capture_chunks(self, channels, reads, chunk_reads=None):
+        chunk_reads = min(chunk_reads or self.chunk_reads, reads)
+        data_arr = (self.INT * (channels * chunk_reads))()
+        done = 0
+        while done < reads:
+            block_reads = min(chunk_reads, reads - done)
+            aorbfirst_c = self.INT(0)
+            rc = self.dll.EVM_DataCap(
+                ctypes.byref(self.USBdev),
+                self.INT(channels),
+                self.INT(block_reads),
+                data_arr,
+                ctypes.byref(aorbfirst_c),
+            )
+            if rc != 0:
+                raise RuntimeError(f"Error in data capture: {rc}")
+            block = np.frombuffer(
+                data_arr, dtype=np.int32, count=channels * block_reads
+            )
+            yield done, block.reshape(block_reads, channels), aorbfirst_c.value
+            done += block_reads
+
+    def capture_frame(self):
+        channels = self.CHANNEL_COUNT
+        reads = self.NDVALID_READ
+        rc, data, _ = self.capture_data(channels, reads, as_array=True)
+        if rc != 0:
+            raise RuntimeError(f"Error in data capture: {rc}")
+        return Frame.from_capture(data, channels, reads, self.BIT_RATE)
+
     def show_registers(self):
         try:
             rc, _ = self.transfer_registers(list(self.RegsIn), list(self.RegsEnable))
@@ -331,65 +422,212 @@ class FPGAControl:
 
         return True
 
+    def reconfigure(self, **params):
+        previous_cfg = (self.CFGHIGH, self.CFGLOW)
+
+        adc_range = params.pop("ADC_RANGE", self.ADC_RANGE)
+        bit_rate = params.pop("BIT_RATE", self.BIT_RATE)
+        for name, value in params.items():
+            attr = self.param_attrs.get(name, name)
+            if not hasattr(self, attr):
+                raise ValueError(f"Unknown parameter: {name}")
+            setattr(self, attr, value)
+        self.set_cfg(adc_range, bit_rate)
+
+        self.reset_regs()
+        self.set_regs()
+        changed = [
+            i
+            for i in range(self.regsSize)
+            if self.RegsEnable[i] and self.RegsIn[i] != self.RegsSent[i]
+        ]
+        self.reset_regs()
+        for i in changed:
+            self.RegsEnable[i] = 1
+
+        if changed:
+            rc, _ = self.transfer_registers(list(self.RegsIn), list(self.RegsEnable))
+            if rc != 0:
+                raise RuntimeError(f"Error in register transfer, result: {rc}")
+
+        if (self.CFGHIGH, self.CFGLOW) != previous_cfg:
+            cfg_result, _, _, _ = self.write_cfg_fast(self.CFGHIGH, self.CFGLOW)
+            if cfg_result != 0:
+                raise RuntimeError(f"Failed to write CFG fast, result: {cfg_result}")
+
+        return changed
+
+    def sent_registers(self):
+        return "".join("--" if v is None else f"{v:02x}" for v in self.RegsSent)
+
+    def record_metadata(self, file_path, filename, file_index):
+        if file_path not in self.metadata_logs:
+            self.metadata_logs[file_path] = MetadataLog.for_run(file_path)
+        fields = dict(self.last_capture)
+        if self.roi is not None:
+            fields["roi"] = str(self.roi)
+        self.metadata_logs[file_path].record(
+            self.sent_registers(),
+            file=os.path.basename(filename),
+            index=file_index + 1,
+            cfg_high=self.CFGHIGH,
+            cfg_low=self.CFGLOW,
+            **fields,
+        )
+
+    def text_writer(self):
+        if self.writer is None or self.writer.bit_rate != self.BIT_RATE:
+            self.writer = TextFrameWriter(self.BIT_RATE)
+        return self.writer
+
+    def readout(self, channels, samples_per_channel):
+        if self.roi is None:
+            return [
+                (side, np.arange(channels), 0, samples_per_channel) for side in range(2)
+            ]
+        return self.roi.selection(channels, samples_per_channel)
+
     def get_data(self, file_path, file_index):
         filename = f"{file_path}_{file_index+1}.txt"
 
         channels = self.CHANNEL_COUNT
         reads = self.NDVALID_READ
-        rc, all_data, all_data_aorbfirst = self.capture_data(channels, reads)
+        if reads > self.chunk_reads:
+            return self.get_data_chunked(file_path, file_index)
+
+        rc, all_data, _ = self.capture_data(channels, reads, as_array=True)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        self.record_metadata(file_path, filename, file_index)
         if rc != 0:
             raise RuntimeError(f"Error in data capture: {rc}")
 
+        samples_per_channel = reads // 2
+        samples = all_data[: 2 * samples_per_channel * channels]
+        samples = samples.reshape(2, samples_per_channel, channels).transpose(0, 2, 1)
+        writer = self.text_writer()
+        with open(filename, "wb") as dataFile:
+            for side, used, start, stop in self.readout(channels, samples_per_channel):
+                writer.write(
+                    dataFile, side, samples[side, used, start:stop], start, used
+                )
+
+        return f"File {filename} was saved successfully"
+
+    def publish_region(self, channels, samples_per_channel):
+        if self.roi is None:
+            return np.arange(channels), (0, 1), 0, samples_per_channel
+        start, stop = self.roi.sample_range(samples_per_channel)
+        used = np.flatnonzero(self.roi.mask(channels).any(axis=0))
+        return used, self.roi.side_idx, start, stop
+
+    @staticmethod
+    def publish_rows(frame, block, first_read, samples_per_channel, region):
+        used, side_idx, start, stop = region
+        for k, side in enumerate(side_idx):
+            base = side * samples_per_channel
+            lo = max(first_read, base + start)
+            hi = min(first_read + len(block), base + stop)
+            if lo < hi:
+                rows = block[lo - first_read : hi - first_read]
+                row = k * (stop - start) + lo - base - start
+                frame[row : row + hi - lo] = rows[:, used]
+
+    @staticmethod
+    def spool_offset(channels, samples_per_channel, side, ch, sample):
+        index = (side * channels + ch) * samples_per_channel + sample
+        return index * np.dtype(np.int32).itemsize
+
+    def spool_block(self, spool, block, first_read, samples_per_channel):
+        channels = block.shape[1]
+        for side in range(2):
+            base = side * samples_per_channel
+            lo = max(first_read, base)
+            hi = min(first_read + len(block), base + samples_per_channel)
+            if lo >= hi:
+                continue
+            columns = np.ascontiguousarray(block[lo - first_read : hi - first_read].T)
+            for ch in range(channels):
+                spool.seek(
+                    self.spool_offset(
+                        channels, samples_per_channel, side, ch, lo - base
+                    )
+                )
+                spool.write(columns[ch])
+
+    def get_data_chunked(self, file_path, file_index, chunk_reads=None):
+        filename = f"{file_path}_{file_index+1}.txt"
+        spool_name = f"{filename}.spool"
+
+        channels = self.CHANNEL_COUNT
+        reads = self.NDVALID_READ
+        samples_per_channel = reads // 2
         os.makedirs(os.path.dirname(filename), exist_ok=True)
 
-        with open(filename, "w") as dataFile:
-            samples_per_channel = reads // 2
-
-            bit_rate = next(k for k, v in self.bit_rates.items() if v == self.DDCbit8)
-            for ch in range(channels - 1, -1, -1):
-                prefix = "0" if (ch + 1) < 10 else ""
-
-                for sample_idx in range(samples_per_channel):
-                    data_idx_a = sample_idx * channels + ch
-
-                    if all_data_aorbfirst == 0:
-                        if data_idx_a < len(all_data):
-                            dataFile.write(
-                                f"{prefix}{ch+1}A, {sample_idx}, {all_data[data_idx_a]}, {0}, {0}, {bit_rate}\n"
-                            )
-                    else:
-                        if data_idx_a < len(all_data):
-                            dataFile.write(
-                                f"{prefix}{ch+1}A, {sample_idx}, {all_data[data_idx_a]}, {0}, {0}, {bit_rate}\n"
-                            )
-
-            for ch in range(channels - 1, -1, -1):
-                prefix = "0" if (ch + 1) < 10 else ""
-
-                for sample_idx in range(samples_per_channel):
-                    data_idx_b = (sample_idx + samples_per_channel) * channels + ch
-
-                    if all_data_aorbfirst == 0:
-                        if data_idx_b < len(all_data):
-                            dataFile.write(
-                                f"{prefix}{ch+1}B, {sample_idx}, {all_data[data_idx_b]}, {0}, {0}, {bit_rate}\n"
-                            )
-                    else:
-                        # When B comes first, we need to handle the indexing differently
-                        if data_idx_b < len(all_data):
-                            dataFile.write(
-                                f"{prefix}{ch+1}B, {sample_idx}, {all_data[data_idx_b]}, {0}, {0}, {bit_rate}\n"
-                            )
+        frame = None
+        if self.publisher is not None:
+            region = self.publish_region(channels, samples_per_channel)
+            published = (len(region[0]), len(region[1]) * (region[3] - region[2]))
+            frame = self.publisher.begin(*published)
+
+        try:
+            with open(spool_name, "w+b") as spool:
+                crc = 0
+                aorbfirst = 0
+                t_before = time.time_ns()
+                for first_read, block, aorbfirst in self.capture_chunks(
+                    channels, reads, chunk_reads
+                ):
+                    crc = zlib.crc32(block, crc)
+                    if frame is not None:
+                        self.publish_rows(
+                            frame, block, first_read, samples_per_channel, region
+                        )
+                    self.spool_block(spool, block, first_read, samples_per_channel)
+                t_after = time.time_ns()
+                self.last_capture = {
+                    "t_before_ns": t_before,
+                    "t_after_ns": t_after,
+                    "rc": 0,
+                    "aorbfirst": aorbfirst,
+                    "channels": channels,
+                    "reads": reads,
+                    "samples": channels * reads,
+                    "crc32": crc,
+                }
+                self.record_metadata(file_path, filename, file_index)
+                if frame is not None:
+                    self.publisher.commit(*published, aorbfirst, t_after, region)
+
+                writer = self.text_writer()
+                values = np.empty(min(self.text_block, samples_per_channel), np.int32)
+                with open(filename, "wb") as dataFile:
+                    for side, used, start, stop in self.readout(
+                        channels, samples_per_channel
+                    ):
+                        for ch in used[::-1]:
+                            for lo in range(start, stop, self.text_block):
+                                count = min(self.text_block, stop - lo)
+                                spool.seek(
+                                    self.spool_offset(
+                                        channels, samples_per_channel, side, ch, lo
+                                    )
+                                )
+                                spool.readinto(values[:count])
+                                dataFile.write(
+                                    writer.format(side, ch, lo, values[:count].tolist())
+                                )
+        finally:
+            os.remove(spool_name)
 
         return f"File {filename} was saved successfully"
 
+    @staticmethod
+    def adc_scale_for(ADC_RANGE, BIT_RATE):
+        return 1e-12 * float(ADC_RANGE) / (2**BIT_RATE - 1)
+
+    @property
+    def adc_scale(self):
+        return self.adc_scale_for(self.ADC_RANGE, self.BIT_RATE)
+
     def convert_adc(self, value):
-        power = next(k for k, v in self.bit_rates.items() if v == self.DDCbit8)
-        adc_range = 1e-12 * float(
-            next(
-                k
-                for k, v in self.adc_ranges.items()
-                if v == (self.DDCbit10, self.DDCbit9)
-            )
-        )
-        return value / (2**power - 1) * adc_range
+        return value * self.adc_scale
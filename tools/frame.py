@@ -0,0 +1,47 @@
+import numpy as np
+
+
+class Frame:
+    sides = ("A", "B")
+
+    def __init__(self, samples, bit_rate=20):
+        self.samples = np.asarray(samples, dtype=float)
+        self.bit_rate = bit_rate
+
+    @property
+    def channels(self):
+        return self.samples.shape[1]
+
+    @property
+    def length(self):
+        return self.samples.shape[2]
+
+    @classmethod
+    def from_capture(cls, data, channels, reads, bit_rate=20):
+        half = reads // 2
+        block = np.asarray(data)[: 2 * half * channels].reshape(2 * half, channels)
+        samples = np.stack((block[:half].T, block[half:].T))
+        return cls(samples, bit_rate)
+
+    @classmethod
+    def from_file(cls, file_path):
+        with open(file_path) as f:
+            fields = f.read().replace(",", " ").split()
+        if len(fields) % 6:
+            raise ValueError(f"Malformed data file: {file_path}")
+        table = np.array(fields).reshape(-1, 6)
+
+        labels, label_idx = np.unique(table[:, 0], return_inverse=True)
+        label_side = np.array([cls.sides.index(label[-1]) for label in labels])
+        label_channel = np.array([int(label[:-1]) - 1 for label in labels])
+
+        side = label_side[label_idx]
+        channel = label_channel[label_idx]
+        sample = table[:, 1].astype(int)
+        value = table[:, 2].astype(float)
+
+        samples = np.full(
+            (2, label_channel.max() + 1, sample.max() + 1), np.nan, dtype=float
+        )
+        samples[side, channel, sample] = value
+        return cls(samples, int(table[0, 5]))
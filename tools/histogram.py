@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class AmplitudeHistogram:
+    sides = ("A", "B")
+
+    def __init__(self, channels, bins, low, high):
+        if bins <= 0 or high <= low:
+            raise ValueError("Invalid histogram binning")
+        self.channels = channels
+        self.bins = bins
+        self.low = float(low)
+        self.high = float(high)
+        self.counts = np.zeros((2, channels, bins), dtype=np.int64)
+        self.underflow = np.zeros((2, channels), dtype=np.int64)
+        self.overflow = np.zeros((2, channels), dtype=np.int64)
+        self.frames = 0
+        self._offsets = (np.arange(2 * channels) * (bins + 2)).reshape(2, channels, 1)
+
+    @property
+    def edges(self):
+        return np.linspace(self.low, self.high, self.bins + 1)
+
+    @property
+    def entries(self):
+        return self.counts.sum(axis=-1) + self.underflow + self.overflow
+
+    def fill(self, samples):
+        samples = np.asarray(samples)
+        if samples.shape[-3:-1] != (2, self.channels):
+            raise ValueError("Samples must have shape (..., 2, channels, n)")
+
+        scale = self.bins / (self.high - self.low)
+        idx = np.floor((samples - self.low) * scale).astype(np.int64)
+        np.clip(idx + 1, 0, self.bins + 1, out=idx)
+        flat = (idx + self._offsets).ravel()
+        counts = np.bincount(flat, minlength=2 * self.channels * (self.bins + 2))
+        counts = counts.reshape(2, self.channels, self.bins + 2)
+
+        self.underflow += counts[..., 0]
+        self.overflow += counts[..., -1]
+        self.counts += counts[..., 1:-1]
+        self.frames += int(np.prod(samples.shape[:-3]))
+
+    def save(self, file_path):
+        np.savez_compressed(
+            file_path,
+            counts=self.counts,
+            underflow=self.underflow,
+            overflow=self.overflow,
+            range=np.array([self.low, self.high]),
+            frames=self.frames,
+        )
+
+    @classmethod
+    def load(cls, file_path):
+        with np.load(file_path) as data:
+            channels, bins = data["counts"].shape[1:]
+            low, high = data["range"]
+            histogram = cls(channels, bins, low, high)
+            histogram.counts[...] = data["counts"]
+            histogram.underflow[...] = data["underflow"]
+            histogram.overflow[...] = data["overflow"]
+            histogram.frames = int(data["frames"])
+        return histogram
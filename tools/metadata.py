@@ -0,0 +1,33 @@
+import json
+
+
+class MetadataLog:
+    suffix = "_meta.jsonl"
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.last_registers = None
+
+    @classmethod
+    def for_run(cls, run_path):
+        return cls(f"{run_path}{cls.suffix}")
+
+    def record(self, registers, **fields):
+        if registers != self.last_registers:
+            fields["registers"] = registers
+            self.last_registers = registers
+        with open(self.file_path, "a") as f:
+            f.write(json.dumps(fields, separators=(",", ":")) + "\n")
+
+    @staticmethod
+    def read(file_path):
+        records = []
+        registers = None
+        with open(file_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                registers = record.setdefault("registers", registers)
+                records.append(record)
+        return records
@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .extraction import SignalExtractor
+from .frame import Frame
+
+
+class Calibrate:
+    def __init__(self, scale, offset=0.0):
+        self.scale = scale
+        self.offset = offset
+
+    def __call__(self, values):
+        return (values - self.offset) * self.scale
+
+
+class Extract:
+    def __init__(self, method, left, right, baseline=False, edges=None):
+        self.method = method
+        self.left = left
+        self.right = right
+        self.baseline = baseline
+        self.edges = edges
+
+    def __call__(self, samples):
+        if not isinstance(samples, SignalExtractor):
+            samples = SignalExtractor(samples)
+        value, baseline = samples.extract(
+            self.method, self.left, self.right, self.edges
+        )
+        return baseline if self.baseline else value
+
+
+class Decode:
+    def __init__(self, decoder):
+        self.decoder = decoder
+
+    def __call__(self, values):
+        return self.decoder.apply(values)
+
+
+class Scale:
+    def __init__(self, factor):
+        self.factor = factor
+
+    def __call__(self, image):
+        return image * self.factor
+
+
+class Normalize:
+    def __init__(self, reference):
+        self.reference = reference
+
+    def __call__(self, image):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return image / self.reference
+
+
+class Threshold:
+    def __init__(self, upper=1.0, lower=None):
+        self.upper = upper
+        self.lower = lower
+
+    def __call__(self, image):
+        return np.clip(image, self.lower, self.upper)
+
+
+class Mask:
+    def __init__(self, interpolator):
+        self.interpolator = interpolator
+
+    def __call__(self, image):
+        return self.interpolator(image)
+
+
+class Pipeline:
+    def __init__(self, *stages, executor=None):
+        self.stages = [stage for stage in stages if stage is not None]
+        self.executor = executor
+
+    def __call__(self, data):
+        for stage in self.stages:
+            data = stage(data)
+        return data
+
+    def submit(self, data):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        return self.executor.submit(self, data)
+
+    def run_files(self, file_paths):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        return self.executor.map(
+            lambda file_path: self(Frame.from_file(file_path).samples), file_paths
+        )
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
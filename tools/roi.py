@@ -0,0 +1,126 @@
+import numpy as np
+
+
+class RegionOfInterest:
+    sides = ("A", "B")
+
+    def __init__(self, channel_mask=None, window=None, sides="AB", spec=""):
+        if channel_mask is not None:
+            channel_mask = np.asarray(channel_mask, dtype=bool)
+            if channel_mask.ndim != 2 or channel_mask.shape[0] != 2:
+                raise ValueError("Channel mask must have shape (2, channels)")
+        if window is not None and not 0 <= window[0] < window[1]:
+            raise ValueError(f"Invalid sample window: {window}")
+        if any(side not in self.sides for side in sides):
+            raise ValueError(f"Unknown side in {sides}")
+        side_idx = tuple(sorted({self.sides.index(side) for side in sides}))
+        if not side_idx:
+            raise ValueError("Region of interest needs at least one side")
+        self.channel_mask = channel_mask
+        self.window = window
+        self.side_idx = side_idx
+        self.spec = spec
+
+    def __str__(self):
+        return self.spec
+
+    @staticmethod
+    def parse_range(text):
+        values = []
+        for part in text.split(","):
+            first, _, last = part.strip().partition("-")
+            first, last = int(first), int(last or first)
+            if last < first:
+                raise ValueError(f"Invalid range: {part.strip()}")
+            values.extend(range(first, last + 1))
+        return values
+
+    @classmethod
+    def from_channels(cls, channels, **kwargs):
+        channels = np.asarray(channels, dtype=int)
+        if channels.size and channels.min() < 1:
+            raise ValueError("Channel numbers start at 1")
+        channel_mask = np.zeros((2, channels.max(initial=0)), dtype=bool)
+        channel_mask[:, channels - 1] = True
+        return cls(channel_mask, **kwargs)
+
+    @classmethod
+    def from_decoder(cls, decoder, rows=None, cols=None, **kwargs):
+        rows = slice(None) if rows is None else list(rows)
+        cols = slice(None) if cols is None else list(cols)
+        channel_map = decoder.channel_map[rows][:, cols]
+        side_map = decoder.side_map[rows][:, cols]
+        alive = ~decoder.dead[rows][:, cols]
+
+        channel_mask = np.zeros((2, decoder.max_channel), dtype=bool)
+        channel_mask[side_map[alive], channel_map[alive] - 1] = True
+        return cls(channel_mask, **kwargs)
+
+    @classmethod
+    def parse(cls, text, decoder=None):
+        entries = {}
+        for entry in text.split(";"):
+            if not entry.strip():
+                continue
+            name, _, value = entry.partition("=")
+            name = name.strip().lower()
+            if not name or not value.strip():
+                raise ValueError(f"Invalid ROI entry: {entry}")
+            entries[name] = value.strip()
+
+        kwargs = {"spec": text.strip()}
+        if "sides" in entries:
+            kwargs["sides"] = entries.pop("sides").upper()
+        if "samples" in entries:
+            samples = cls.parse_range(entries.pop("samples"))
+            kwargs["window"] = (min(samples), max(samples) + 1)
+
+        if "rows" in entries or "cols" in entries:
+            if decoder is None:
+                raise ValueError("Decoder matrix is required for rows/cols")
+            rows = cls.parse_range(entries.pop("rows")) if "rows" in entries else None
+            cols = cls.parse_range(entries.pop("cols")) if "cols" in entries else None
+            roi = cls.from_decoder(decoder, rows, cols, **kwargs)
+        elif "channels" in entries:
+            channels = cls.parse_range(entries.pop("channels"))
+            roi = cls.from_channels(channels, **kwargs)
+        else:
+            roi = cls(**kwargs)
+        if entries:
+            raise ValueError(f"Unknown ROI entries: {', '.join(entries)}")
+        return roi
+
+    def mask(self, channels):
+        mask = np.zeros((2, channels), dtype=bool)
+        for side in self.side_idx:
+            if self.channel_mask is None:
+                mask[side] = True
+            else:
+                n = min(channels, self.channel_mask.shape[1])
+                mask[side, :n] = self.channel_mask[side, :n]
+        return mask
+
+    def sample_range(self, length):
+        if self.window is None:
+            return 0, length
+        return min(self.window[0], length), min(self.window[1], length)
+
+    def selection(self, channels, length):
+        mask = self.mask(channels)
+        start, stop = self.sample_range(length)
+        return [
+            (side, np.flatnonzero(mask[side]), start, stop) for side in self.side_idx
+        ]
+
+    def fraction(self, channels, length):
+        start, stop = self.sample_range(length)
+        return self.mask(channels).sum() * (stop - start) / (2 * channels * length)
+
+    def capture_block(self, data, channels, reads):
+        half = reads // 2
+        samples = np.asarray(data)[: 2 * half * channels].reshape(2, half, channels)
+        start, stop = self.sample_range(half)
+        used = np.flatnonzero(self.mask(channels).any(axis=0))
+        sides = slice(self.side_idx[0], self.side_idx[-1] + 1)
+        block = samples[sides, start:stop][..., used]
+        return np.ascontiguousarray(block).reshape(-1, len(used)), used
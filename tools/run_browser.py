@@ -0,0 +1,171 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import os
+import re
+from .frame import Frame
+
+
+class FrameCache:
+    def __init__(self, capacity=32, loader=Frame.from_file, workers=1):
+        if capacity <= 0:
+            raise ValueError("Cache capacity must be positive")
+        self.capacity = capacity
+        self.loader = loader
+        self.workers = workers
+        self.frames = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.executor = None
+
+    @staticmethod
+    def path_key(file_path):
+        return os.path.normcase(os.path.abspath(file_path))
+
+    @classmethod
+    def key(cls, file_path):
+        path = cls.path_key(file_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path, None, None
+        return path, stat.st_mtime_ns, stat.st_size
+
+    def __contains__(self, file_path):
+        with self.lock:
+            return self.key(file_path) in self.frames
+
+    def __len__(self):
+        with self.lock:
+            return len(self.frames)
+
+    def store(self, key, frame):
+        with self.lock:
+            for stale in [k for k in self.frames if k[0] == key[0] and k != key]:
+                del self.frames[stale]
+            self.frames[key] = frame
+            self.frames.move_to_end(key)
+            while len(self.frames) > self.capacity:
+                self.frames.popitem(last=False)
+
+    def get(self, file_path):
+        key = self.key(file_path)
+        with self.lock:
+            if key in self.frames:
+                self.frames.move_to_end(key)
+                return self.frames[key]
+            future = self.pending.get(key)
+        if future is not None:
+            return future.result()
+        frame = self.loader(file_path)
+        self.store(key, frame)
+        return frame
+
+    def load(self, key, file_path):
+        try:
+            frame = self.loader(file_path)
+            self.store(key, frame)
+            return frame
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+
+    def prefetch(self, file_paths):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        keys = {self.key(path): path for path in file_paths[: self.capacity - 1]}
+        with self.lock:
+            for key, future in list(self.pending.items()):
+                if key not in keys and future.cancel():
+                    del self.pending[key]
+            for key, file_path in keys.items():
+                if key not in self.frames and key not in self.pending:
+                    self.pending[key] = self.executor.submit(self.load, key, file_path)
+
+    def shutdown(self):
+        if self.executor is not None:
+            with self.lock:
+                for future in self.pending.values():
+                    future.cancel()
+            self.executor.shutdown()
+            self.executor = None
+
+
+class RunSeries:
+    pattern = re.compile(r"(.+)_(\d+)\.txt")
+
+    def __init__(self, folder_path, file_name):
+        self.folder_path = folder_path
+        self.file_name = file_name
+        self.paths = []
+        self.refresh()
+
+    @classmethod
+    def from_file(cls, file_path):
+        folder_path, base_name = os.path.split(file_path)
+        match = cls.pattern.fullmatch(base_name)
+        if not match:
+            series = cls(folder_path, None)
+            series.paths = [file_path]
+            return series
+        return cls(folder_path, match.group(1))
+
+    def refresh(self):
+        if self.file_name is None or not os.path.isdir(self.folder_path):
+            return self.paths
+        indices = []
+        for fname in os.listdir(self.folder_path):
+            match = self.pattern.fullmatch(fname)
+            if match and match.group(1) == self.file_name:
+                indices.append((int(match.group(2)), fname))
+        self.paths = [
+            os.path.join(self.folder_path, fname) for _, fname in sorted(indices)
+        ]
+        return self.paths
+
+    def __len__(self):
+        return len(self.paths)
+
+    def index(self, file_path):
+        keys = [FrameCache.path_key(path) for path in self.paths]
+        return keys.index(FrameCache.path_key(file_path))
+
+
+class RunBrowser:
+    def __init__(self, capacity=32, prefetch=4, loader=Frame.from_file):
+        self.cache = FrameCache(capacity, loader)
+        self.prefetch = prefetch
+        self.series = None
+        self.position = 0
+
+    def __len__(self):
+        return 0 if self.series is None else len(self.series)
+
+    def path(self, position):
+        return self.series.paths[position]
+
+    def open(self, file_path):
+        try:
+            position = self.series.index(file_path)
+        except (AttributeError, ValueError):
+            self.series = RunSeries.from_file(file_path)
+            try:
+                position = self.series.index(file_path)
+            except ValueError:
+                self.series.paths.append(file_path)
+                position = len(self.series) - 1
+        return self.frame(position)
+
+    def frame(self, position):
+        frame = self.cache.get(self.path(position))
+        self.position = position
+        neighbours = []
+        for offset in range(1, self.prefetch + 1):
+            for neighbour in (position + offset, position - offset):
+                if 0 <= neighbour < len(self):
+                    neighbours.append(self.path(neighbour))
+        self.cache.prefetch(neighbours)
+        return frame
+
+    def shutdown(self):
+        self.cache.shutdown()
@@ -0,0 +1,108 @@
+import csv
+import itertools
+import os
+import time
+
+
+class ParameterScan:
+    text_params = ("ADC_RANGE",)
+
+    def __init__(self, fpga, grid, frames_per_point, folder_path, file_name):
+        if frames_per_point <= 0:
+            raise ValueError("Frames per point must be positive")
+        if not grid:
+            raise ValueError("Empty parameter grid")
+        self.fpga = fpga
+        self.grid = dict(grid)
+        self.frames_per_point = frames_per_point
+        self.folder_path = folder_path
+        self.file_name = file_name
+        self.stopped = False
+
+    @classmethod
+    def parse_grid(cls, text):
+        grid = {}
+        for entry in text.split(";"):
+            if not entry.strip():
+                continue
+            name, _, values = entry.partition("=")
+            name = name.strip()
+            values = [v.strip() for v in values.split(",") if v.strip()]
+            if not name or not values:
+                raise ValueError(f"Invalid scan entry: {entry}")
+            grid[name] = values if name in cls.text_params else list(map(int, values))
+        return grid
+
+    @property
+    def points(self):
+        names = list(self.grid)
+        return [
+            dict(zip(names, values))
+            for values in itertools.product(*(self.grid[name] for name in names))
+        ]
+
+    @property
+    def total_frames(self):
+        return len(self.points) * self.frames_per_point
+
+    @staticmethod
+    def tag(point):
+        return "_".join(f"{name}-{value}" for name, value in point.items())
+
+    def stop(self):
+        self.stopped = True
+
+    def current(self):
+        params = {}
+        for name in self.grid:
+            attr = self.fpga.param_attrs.get(name, name)
+            if not hasattr(self.fpga, attr):
+                raise ValueError(f"Unknown parameter: {name}")
+            params[name] = getattr(self.fpga, attr)
+        return params
+
+    def run(self, progress=None, status=None):
+        os.makedirs(self.folder_path, exist_ok=True)
+        index_path = os.path.join(self.folder_path, f"{self.file_name}_scan.csv")
+        names = list(self.grid)
+        done = 0
+
+        original = self.current()
+        try:
+            with open(index_path, "w", newline="") as index_file:
+                writer = csv.writer(index_file)
+                writer.writerow(["point", *names, "frame", "file", "reconfigure_s"])
+
+                for point_idx, point in enumerate(self.points):
+                    if self.stopped:
+                        break
+                    start = time.perf_counter()
+                    self.fpga.reconfigure(**point)
+                    reconfigure_time = time.perf_counter() - start
+
+                    file_path = os.path.join(
+                        self.folder_path, f"{self.file_name}_{self.tag(point)}"
+                    )
+                    for frame_idx in range(self.frames_per_point):
+                        if self.stopped:
+                            break
+                        self.fpga.get_data(file_path, frame_idx)
+                        writer.writerow(
+                            [
+                                point_idx,
+                                *point.values(),
+                                frame_idx,
+                                f"{file_path}_{frame_idx+1}.txt",
+                                f"{reconfigure_time:.6f}",
+                            ]
+                        )
+                        done += 1
+                        if progress:
+                            progress(done)
+                    index_file.flush()
+                    if status:
+                        status(f"Scan point {point_idx + 1}: {self.tag(point)} done")
+        finally:
+            self.fpga.reconfigure(**original)
+
+        return index_path
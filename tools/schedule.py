@@ -0,0 +1,106 @@
+import csv
+import os
+import threading
+import time
+import numpy as np
+
+
+class AcquisitionSchedule:
+    def __init__(self, interval, slots, burst=1, burst_interval=0.0, clock=None):
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+        if slots <= 0 or burst <= 0:
+            raise ValueError("Slots and burst size must be positive")
+        if burst_interval < 0 or (burst - 1) * burst_interval >= interval:
+            raise ValueError("Burst does not fit in the interval")
+        self.interval = float(interval)
+        self.slots = slots
+        self.burst = burst
+        self.burst_interval = float(burst_interval)
+        self.clock = clock or time.monotonic
+        self.stopped = threading.Event()
+        self.jitter = []
+        self.skipped = 0
+
+    @property
+    def total_frames(self):
+        return self.slots * self.burst
+
+    def offset(self, slot, frame):
+        return slot * self.interval + frame * self.burst_interval
+
+    def stop(self):
+        self.stopped.set()
+
+    def wait_until(self, deadline):
+        while not self.stopped.is_set():
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return True
+            self.stopped.wait(remaining)
+        return False
+
+    def summary(self):
+        if not self.jitter:
+            return "No frames captured"
+        jitter = np.abs(self.jitter) * 1e3
+        return (
+            f"{len(self.jitter)} frames, jitter mean {jitter.mean():.2f} ms, "
+            f"max {jitter.max():.2f} ms, {self.skipped} slots skipped"
+        )
+
+    def run(self, capture, log_path, progress=None, status=None):
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+        self.jitter = []
+        self.skipped = 0
+        done = 0
+
+        with open(log_path, "w", newline="") as log_file:
+            writer = csv.writer(log_file)
+            writer.writerow(
+                [
+                    "frame",
+                    "slot",
+                    "burst",
+                    "target_s",
+                    "start_s",
+                    "jitter_ms",
+                    "capture_ms",
+                ]
+            )
+            start = self.clock()
+            for slot in range(self.slots):
+                if self.clock() - start > self.offset(slot + 1, 0):
+                    self.skipped += 1
+                    continue
+                for frame in range(self.burst):
+                    target = self.offset(slot, frame)
+                    if not self.wait_until(start + target):
+                        return log_path
+                    begin = self.clock()
+                    capture(done)
+                    end = self.clock()
+                    jitter = begin - start - target
+                    self.jitter.append(jitter)
+                    writer.writerow(
+                        [
+                            done,
+                            slot,
+                            frame,
+                            f"{target:.6f}",
+                            f"{begin - start:.6f}",
+                            f"{jitter * 1e3:.3f}",
+                            f"{(end - begin) * 1e3:.3f}",
+                        ]
+                    )
+                    done += 1
+                    if progress:
+                        progress(done)
+                    if status:
+                        status(
+                            f"Frame {done}/{self.total_frames}: "
+                            f"jitter {jitter * 1e3:.2f} ms"
+                        )
+                log_file.flush()
+
+        return log_path
@@ -0,0 +1,227 @@
+import os
+import queue
+import sys
+import struct
+import tempfile
+import threading
+import time
+from multiprocessing import shared_memory, resource_tracker
+from multiprocessing.connection import Listener, Client
+import numpy as np
+
+
+class SharedFrameRing:
+    magic = b"DDC264R2"
+    header = struct.Struct("<8sqqq")
+    slot_header = struct.Struct("<qqqqqqqq")
+    sides = ("A", "B")
+    message = struct.Struct("<qq")
+    header_size = 64
+    slot_header_size = 64
+    dtype = np.int32
+
+    @staticmethod
+    def address(name):
+        if sys.platform == "win32":
+            return rf"\\.\pipe\{name}"
+        return os.path.join(tempfile.gettempdir(), f"{name}.sock")
+
+    def slot_size(self):
+        itemsize = np.dtype(self.dtype).itemsize
+        return self.slot_header_size + (self.channels + self.capacity) * itemsize
+
+    def slot_offset(self, slot):
+        return self.header_size + slot * self.slot_size()
+
+    def slot_channels(self, slot):
+        return np.ndarray(
+            (self.channels,),
+            dtype=self.dtype,
+            buffer=self.shm.buf,
+            offset=self.slot_offset(slot) + self.slot_header_size,
+        )
+
+    def slot_data(self, slot):
+        itemsize = np.dtype(self.dtype).itemsize
+        return np.ndarray(
+            (self.capacity,),
+            dtype=self.dtype,
+            buffer=self.shm.buf,
+            offset=self.slot_offset(slot)
+            + self.slot_header_size
+            + self.channels * itemsize,
+        )
+
+    def slot_info(self, slot):
+        return self.slot_header.unpack_from(self.shm.buf, self.slot_offset(slot))
+
+
+class FramePublisher(SharedFrameRing):
+    def __init__(self, name, capacity, channels, slots=8):
+        self.name = name
+        self.capacity = capacity
+        self.channels = channels
+        self.slots = slots
+        self.seq = 0
+        self.dropped = 0
+        self.lagging = 0
+        self.clients = []
+        self.lock = threading.Lock()
+
+        size = self.header_size + slots * self.slot_size()
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.header.pack_into(self.shm.buf, 0, self.magic, slots, capacity, channels)
+
+        address = self.address(name)
+        if sys.platform != "win32" and os.path.exists(address):
+            os.unlink(address)
+        self.listener = Listener(address)
+        self.accept_thread = threading.Thread(target=self.accept, daemon=True)
+        self.accept_thread.start()
+
+    def accept(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                break
+            messages = queue.Queue(self.slots)
+            threading.Thread(
+                target=self.send, args=(conn, messages), daemon=True
+            ).start()
+            with self.lock:
+                self.clients.append(messages)
+
+    def send(self, conn, messages):
+        try:
+            while True:
+                message = messages.get()
+                if message is None:
+                    break
+                conn.send_bytes(message)
+        except (OSError, EOFError):
+            pass
+        finally:
+            conn.close()
+            with self.lock:
+                if messages in self.clients:
+                    self.clients.remove(messages)
+
+    def disconnect(self, messages):
+        self.clients.remove(messages)
+        while True:
+            try:
+                messages.get_nowait()
+            except queue.Empty:
+                break
+        messages.put_nowait(None)
+
+    def begin(self, channels, reads):
+        if channels * reads > self.capacity or channels > self.channels:
+            self.dropped += 1
+            return None
+        self.seq += 1
+        slot = self.seq % self.slots
+        self.slot_header.pack_into(
+            self.shm.buf, self.slot_offset(slot), -1, 0, 0, 0, 0, 0, 0, 0
+        )
+        return self.slot_data(slot)[: channels * reads].reshape(reads, channels)
+
+    def commit(self, channels, reads, aorbfirst=0, t_ns=None, region=None):
+        if region is None:
+            region = (np.arange(channels), (0, 1), 0, reads // 2)
+        channel_ids, side_idx, start, stop = region
+        slot = self.seq % self.slots
+        self.slot_channels(slot)[: len(channel_ids)] = channel_ids
+        self.slot_header.pack_into(
+            self.shm.buf,
+            self.slot_offset(slot),
+            self.seq,
+            channels,
+            reads,
+            aorbfirst,
+            time.time_ns() if t_ns is None else t_ns,
+            sum(1 << side for side in side_idx),
+            start,
+            stop,
+        )
+
+        message = self.message.pack(self.seq, slot)
+        with self.lock:
+            for messages in list(self.clients):
+                while True:
+                    try:
+                        messages.put_nowait(message)
+                        break
+                    except queue.Full:
+                        try:
+                            messages.get_nowait()
+                            self.lagging += 1
+                        except queue.Empty:
+                            pass
+        return True
+
+    def publish(self, data, channels, reads, aorbfirst=0, t_ns=None, region=None):
+        if not isinstance(data, np.ndarray):
+            data = np.frombuffer(data, dtype=self.dtype)
+        frame = self.begin(channels, reads)
+        if frame is None:
+            return False
+        frame[...] = data.reshape(frame.shape)
+        return self.commit(channels, reads, aorbfirst, t_ns, region)
+
+    def close(self):
+        self.listener.close()
+        with self.lock:
+            for messages in list(self.clients):
+                self.disconnect(messages)
+        self.shm.close()
+        self.shm.unlink()
+        address = self.address(self.name)
+        if sys.platform != "win32" and os.path.exists(address):
+            os.unlink(address)
+
+
+class FrameSubscriber(SharedFrameRing):
+    def __init__(self, name):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            self.shm = shared_memory.SharedMemory(name=name)
+            if os.name == "posix":
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+        magic, self.slots, self.capacity, self.channels = self.header.unpack_from(
+            self.shm.buf, 0
+        )
+        if magic != self.magic:
+            self.shm.close()
+            raise ValueError(f"Shared memory {name} is not a frame ring")
+        self.conn = Client(self.address(name))
+
+    def receive(self, timeout=None):
+        if not self.conn.poll(timeout):
+            return None
+        seq, slot = self.message.unpack(self.conn.recv_bytes())
+        return self.read(seq, slot)
+
+    def read(self, seq, slot):
+        current, channels, reads, aorbfirst, t_ns, sides, start, stop = self.slot_info(
+            slot
+        )
+        if current != seq:
+            return None
+        data = self.slot_data(slot)[: channels * reads].reshape(reads, channels)
+        region = (
+            self.slot_channels(slot)[:channels].copy(),
+            "".join(side for i, side in enumerate(self.sides) if sides >> i & 1),
+            start,
+            stop,
+        )
+        return seq, slot, data, aorbfirst, t_ns, region
+
+    def valid(self, seq, slot):
+        return self.slot_info(slot)[0] == seq
+
+    def close(self):
+        self.conn.close()
+        self.shm.close()
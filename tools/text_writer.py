@@ -0,0 +1,52 @@
+from collections import OrderedDict
+import os
+import numpy as np
+
+
+class TextFrameWriter:
+    sides = ("A", "B")
+    block_lines = 1 << 18
+    max_template_bytes = 1 << 24
+
+    def __init__(self, bit_rate, newline=os.linesep):
+        self.bit_rate = bit_rate
+        self.line_end = f", 0, 0, {bit_rate}{newline}".encode()
+        self.templates = OrderedDict()
+        self.template_bytes = 0
+
+    def template(self, start, count):
+        key = (start, count)
+        template = self.templates.get(key)
+        if template is None:
+            template = b"".join(
+                b"\0, %d, %%d%s" % (i, self.line_end)
+                for i in range(start, start + count)
+            )
+            if len(template) <= self.max_template_bytes:
+                while self.template_bytes + len(template) > self.max_template_bytes:
+                    self.template_bytes -= len(self.templates.popitem(last=False)[1])
+                self.templates[key] = template
+                self.template_bytes += len(template)
+        else:
+            self.templates.move_to_end(key)
+        return template
+
+    def label(self, side, ch):
+        return f"{ch+1:02d}{self.sides[side]}".encode()
+
+    def format(self, side, ch, start, values):
+        template = self.template(start, len(values))
+        return template.replace(b"\0", self.label(side, ch)) % tuple(values)
+
+    def write(self, data_file, side, rows, start=0, channels=None):
+        rows = np.asarray(rows)
+        channels = range(len(rows)) if channels is None else list(channels)
+        per_block = max(1, self.block_lines // max(rows.shape[1], 1))
+        values = rows.tolist()
+        for hi in range(len(values), 0, -per_block):
+            data_file.write(
+                b"".join(
+                    self.format(side, channels[i], start, values[i])
+                    for i in range(hi - 1, max(hi - per_block, 0) - 1, -1)
+                )
+            )